@@ -0,0 +1,63 @@
+"""Check that anchor-group rescaling recovers one scale for many keywords.
+
+Run from the backend directory:
+
+    python benchmarks/compare_rescale.py [keywords]
+
+Generates true search volumes for a set of keywords, normalizes each anchor
+group the way Google Trends does (per payload, 0-100, rounded), merges them
+with merge_over_time / merge_by_region and reports the error against the true
+volumes on the same 0-100 scale.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from trends_compare import anchor_groups, merge_over_time, merge_by_region
+
+STATES = ['California', 'Texas', 'New York', 'Florida', 'Ohio', 'Washington']
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rng = np.random.default_rng(0)
+    keywords = [f"keyword {i}" for i in range(count)]
+    index = pd.date_range('2024-01-07', periods=52, freq='W')
+
+    # True volumes; the anchor (first keyword) is a mid-sized, steady term
+    levels = rng.uniform(20, 400, size=count)
+    levels[0] = 150
+    volumes = levels * (1 + 0.3 * np.sin(np.arange(52)[:, None] / 8 + rng.uniform(0, 6, size=count)))
+    regional = rng.uniform(1, 10, size=(len(STATES), count)) * levels
+
+    over_time, by_region = [], []
+    for group in anchor_groups(keywords):
+        cols = [keywords.index(kw) for kw in group]
+        # Google scales each payload so its largest point is 100
+        block = volumes[:, cols]
+        over_time.append(pd.DataFrame(np.rint(block / block.max() * 100), index=index, columns=group))
+        # ... and splits each region's interest between the payload's keywords
+        block = regional[:, cols]
+        by_region.append(pd.DataFrame(np.rint(block / block.sum(axis=1, keepdims=True) * 100),
+                                      index=STATES, columns=group))
+
+    started = time.perf_counter()
+    merged_time = merge_over_time(over_time, keywords[0])
+    merged_region = merge_by_region(by_region, keywords[0])
+    elapsed = (time.perf_counter() - started) * 1000
+
+    expected_time = volumes / volumes.max() * 100
+    expected_region = regional / regional.sum(axis=1, keepdims=True) * 100
+    time_error = np.abs(merged_time[keywords].to_numpy() - expected_time)
+    region_error = np.abs(merged_region.loc[STATES, keywords].to_numpy() - expected_region)
+
+    print(f"{count} keywords in {len(over_time)} anchor groups, merged in {elapsed:.1f} ms")
+    print(f"interest over time: mean error {time_error.mean():.2f}, max error {time_error.max():.2f} (0-100 scale)")
+    print(f"interest by region: mean error {region_error.mean():.2f}, max error {region_error.max():.2f} (share of 100)")
+
+if __name__ == "__main__":
+    main()
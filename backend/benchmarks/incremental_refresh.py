@@ -0,0 +1,96 @@
+"""Check incremental refresh of `today 5-y` series against full refetches.
+
+Run from the backend directory:
+
+    python benchmarks/incremental_refresh.py [weeks]
+
+Uses a stand-in for TrendReq that serves one synthetic weekly search volume,
+normalized per request to a peak of 100 and rounded like Google Trends, with
+a clock that advances one week per refresh. Each refresh goes through
+refresh_trends and is compared with what a full fetch would have returned at
+the same time. At the end the stand-in revises its history, which must make
+the refresh fall back to a full fetch.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ["SENTIMENT_PRELOAD"] = "0"
+os.environ["TRENDS_STORE_DB"] = ""
+# Measure the refresh, not the Google Trends rate limiter
+os.environ["TRENDS_RATE_PER_SECOND"] = "1000"
+os.environ["TRENDS_BURST"] = "1000"
+
+import numpy as np
+import pandas as pd
+
+rng = np.random.default_rng(0)
+VOLUME = 1000 + 400 * np.sin(np.arange(400) / 9) + np.cumsum(rng.normal(0, 20, 400))
+CLOCK = {"week": 300}
+CALLS = {"requests": 0, "rows": 0}
+START = pd.Timestamp('2018-01-07')
+
+class FakeTrendReq:
+    def build_payload(self, kw_list, cat=0, timeframe='today 5-y', geo='', gprop=''):
+        CALLS["requests"] += 1
+        self.keyword = kw_list[0]
+        if timeframe == 'today 5-y':
+            self.weeks = 261
+        else:
+            start, end = (pd.Timestamp(day) for day in timeframe.split())
+            self.weeks = (end - start).days // 7 + 1
+
+    def interest_over_time(self):
+        CALLS["requests"] += 1
+        end = CLOCK["week"] + 1
+        window = VOLUME[end - self.weeks:end]
+        index = pd.DatetimeIndex(START + pd.to_timedelta(7 * np.arange(end - self.weeks, end), unit='D'), name='date')
+        frame = pd.DataFrame({self.keyword: np.rint(window / window.max() * 100).astype(int)}, index=index)
+        frame['isPartial'] = False
+        frame.iloc[-1, -1] = True
+        CALLS["rows"] += len(frame)
+        return frame
+
+    def interest_by_region(self, resolution='COUNTRY', inc_low_vol=False, inc_geo_code=False):
+        CALLS["requests"] += 1
+        CALLS["rows"] += 2
+        return pd.DataFrame({self.keyword: [50, 60]}, index=['Texas', 'Ohio'])
+
+def main():
+    weeks = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+
+    import main as app_main
+    from trends_pool import TrendReqPool
+    app_main.trends_pool = TrendReqPool(size=1, factory=FakeTrendReq)
+
+    keyword = "coffee"
+    app_main.refresh_trends(71, keyword, "today 5-y", "US")
+    full_requests, full_rows = CALLS["requests"], CALLS["rows"]
+    print(f"full fetch: {full_requests} requests, {full_rows} rows")
+
+    errors = []
+    CALLS.update(requests=0, rows=0)
+    for _ in range(weeks):
+        CLOCK["week"] += 1
+        entry, _ = app_main.refresh_trends(71, keyword, "today 5-y", "US")
+        got = np.asarray(entry.value["interest_over_time"][keyword]["values"], dtype=float)
+        expected = FakeTrendReq()
+        expected.build_payload([keyword])
+        truth = expected.interest_over_time()[keyword].to_numpy()
+        errors.append(np.abs(got - truth).max())
+    requests, rows = CALLS["requests"] - 2 * weeks, CALLS["rows"] - 261 * weeks
+    print(f"{weeks} incremental refreshes: {requests / weeks:.1f} requests and "
+          f"{rows / weeks:.0f} rows each, max error vs full fetch {max(errors):.0f} points")
+    print(app_main.series_extender.stats())
+
+    # Google revising history must not be papered over
+    VOLUME[CLOCK["week"] - 30:CLOCK["week"] - 20] *= 2
+    CLOCK["week"] += 1
+    CALLS.update(requests=0, rows=0)
+    app_main.refresh_trends(71, keyword, "today 5-y", "US")
+    print(f"after a history revision: {CALLS['requests']} requests (window + full fallback), "
+          f"{app_main.series_extender.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare response encoding with FastAPI's default path and FastJSONResponse.
+
+Run from the backend directory:
+
+    python benchmarks/json_encoding.py [keywords] [iterations]
+
+Builds a `today 5-y` comparison result (261 weeks by state for the given number
+of keywords) and times rendering it to bytes:
+
+- before: the series converted with .tolist(), run through jsonable_encoder
+  and rendered by the stdlib-json JSONResponse, as FastAPI does for a dict
+- after: the NumPy-valued result rendered by FastJSONResponse (orjson)
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ["SENTIMENT_PRELOAD"] = "0"
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+import numpy as np
+import orjson
+import pandas as pd
+
+from json_response import FastJSONResponse
+from main import STATE_CODES, serialize_dataframe
+
+def as_lists(data):
+    """The result as serialize_dataframe built it before, with plain lists."""
+    if isinstance(data, dict):
+        return {key: as_lists(value) for key, value in data.items()}
+    return data.tolist() if isinstance(data, np.ndarray) else data
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    rng = np.random.default_rng(0)
+    keywords = [f"keyword {i}" for i in range(count)]
+
+    index = pd.date_range('2019-10-20', periods=261, freq='W', name='date')
+    over_time = pd.DataFrame(rng.integers(0, 101, size=(261, count)), index=index, columns=keywords)
+    over_time['isPartial'] = False
+    by_region = pd.DataFrame(rng.integers(0, 101, size=(len(STATE_CODES), count)),
+                             index=pd.Index(list(STATE_CODES), name='geoName'), columns=keywords)
+    result = {
+        "interest_over_time": serialize_dataframe(over_time),
+        "interest_by_region": serialize_dataframe(by_region)
+    }
+    legacy = as_lists(result)
+
+    def before():
+        return JSONResponse(jsonable_encoder(legacy)).body
+
+    def after():
+        return FastJSONResponse(result).body
+
+    assert orjson.loads(before()) == orjson.loads(after()), "outputs differ"
+
+    before_time = timeit.timeit(before, number=iterations) / iterations
+    after_time = timeit.timeit(after, number=iterations) / iterations
+    print(f"today 5-y comparison of {count} keywords:")
+    print(f"jsonable_encoder + json: {before_time * 1000:.2f} ms, {len(before())} bytes")
+    print(f"FastJSONResponse:        {after_time * 1000:.2f} ms, {len(after())} bytes "
+          f"({before_time / after_time:.0f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare sentiment backends against the fp32 PyTorch model.
+
+Run from the backend directory:
+
+    python benchmarks/sentiment_parity.py [quantized] [onnx]
+
+Prints label agreement and mean per-title latency for each backend and exits
+non-zero if any backend agrees with fp32 on fewer than MIN_AGREEMENT titles.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment import export_onnx, load_backend, load_model, predict_probabilities
+
+MIN_AGREEMENT = 0.95
+
+# Fixed corpus of video titles in the style the sentiment endpoint sees
+CORPUS = [
+    "I tried every energy drink at the gas station so you don't have to",
+    "This plant-based milk is honestly the best thing I've tasted all year",
+    "Worst protein bar ever? Brutally honest review",
+    "How to make cold brew coffee at home",
+    "Sparkling water taste test: 12 brands ranked",
+    "Why I stopped buying this brand of chips",
+    "Healthy snacks that actually taste amazing!",
+    "The truth about functional beverages nobody tells you",
+    "Greek yogurt vs regular yogurt - which is better?",
+    "I'm so disappointed with this new ice cream flavor",
+    "Cheese board ideas for beginners",
+    "Butter vs margarine: what the science says",
+    "My morning skincare routine (updated)",
+    "This shampoo ruined my hair",
+    "Best natural deodorants that actually work",
+    "Oral care mistakes you are probably making",
+    "Cleaning products that are a total waste of money",
+    "Laundry hacks that changed my life",
+    "Paper towel shortage explained",
+    "Air freshener review: love it or hate it?",
+    "Storage and organization ideas for small kitchens",
+    "Vitamins and supplements I take every day",
+    "Protein powder scam exposed",
+    "Digestive health tips from a dietitian",
+    "Immunity boosting smoothie recipe",
+    "Homemade baby food made easy",
+    "Diapers & wipes haul - so many bargains!",
+    "Baby feeding schedule that finally worked for us",
+    "Children's health myths debunked",
+    "Canned goods you should never buy",
+    "Cooking oils ranked from worst to best",
+    "Pasta & grains meal prep for the week",
+]
+
+def run(name: str, runner, repeats: int = 3) -> tuple[list, float]:
+    predict_probabilities(CORPUS, len(CORPUS), runner)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        probs = predict_probabilities(CORPUS, len(CORPUS), runner)
+    per_title = (time.perf_counter() - started) / (repeats * len(CORPUS))
+    labels = [max(range(len(row)), key=row.__getitem__) for row in probs]
+    print(f"{name:>10}: {per_title * 1000:.2f} ms/title")
+    return labels, per_title
+
+def main() -> int:
+    candidates = sys.argv[1:] or ["quantized", "onnx"]
+    reference, _ = run("pytorch", load_backend("pytorch"))
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        onnx_path = os.path.join(tmp, "model.onnx")
+        if "onnx" in candidates:
+            export_onnx(load_model(), onnx_path)
+        for name in candidates:
+            runner = load_backend(name, onnx_path=onnx_path)
+            labels, _ = run(name, runner)
+            agreement = sum(a == b for a, b in zip(reference, labels)) / len(CORPUS)
+            print(f"{name:>10}: {agreement:.1%} label agreement with pytorch")
+            failed = failed or agreement < MIN_AGREEMENT
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Micro-benchmark serialize_dataframe on 5-year weekly trends frames.
+
+Run from the backend directory:
+
+    python benchmarks/serialize_trends.py [iterations]
+
+Builds a `today 5-y` interest over time frame (261 weeks, 5 keywords plus
+isPartial) and an interest by region frame (50 states plus DC and Puerto Rico,
+5 keywords), checks that serialize_dataframe matches the original row-by-row
+implementation, and compares their speed and the default vs columnar JSON size.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ["SENTIMENT_PRELOAD"] = "0"
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from json_response import dumps
+from main import STATE_CODES, serialize_dataframe, columnar
+
+def serialize_dataframe_loop(df: pd.DataFrame):
+    """serialize_dataframe as it was before vectorizing."""
+    if df is None or df.empty:
+        return {}
+    if isinstance(df.index, pd.DatetimeIndex):
+        result = {}
+        for column in df.columns:
+            result[column] = {
+                'dates': df.index.strftime('%Y-%m-%d').tolist(),
+                'values': df[column].tolist()
+            }
+        return result
+    state_codes = dict(STATE_CODES)
+    result = {}
+    for col in df.columns:
+        state_values = {}
+        for state, value in df[col].items():
+            if state in state_codes:
+                state_values[state_codes[state]] = int(value) if pd.notnull(value) else 0
+        result[col] = state_values
+    return result
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rng = np.random.default_rng(0)
+    keywords = ["Coffee & Tea", "Soft Drinks", "Energy Drinks", "Sparkling Water", "Plant-based Milk"]
+
+    index = pd.date_range('2019-10-20', periods=261, freq='W', name='date')
+    over_time = pd.DataFrame(rng.integers(0, 101, size=(261, 5)), index=index, columns=keywords)
+    over_time['isPartial'] = False
+    states = list(STATE_CODES) + ['District of Columbia', 'Puerto Rico']
+    by_region = pd.DataFrame(rng.integers(0, 101, size=(len(states), 5)).astype(float),
+                             index=pd.Index(states, name='geoName'), columns=keywords)
+    by_region.iloc[3, 2] = np.nan
+
+    for frame in (over_time, by_region):
+        assert orjson.loads(dumps(serialize_dataframe(frame))) == serialize_dataframe_loop(frame), "outputs differ"
+
+    for name, frame in (("interest_over_time", over_time), ("interest_by_region", by_region)):
+        before = timeit.timeit(lambda: serialize_dataframe_loop(frame), number=iterations) / iterations
+        after = timeit.timeit(lambda: serialize_dataframe(frame), number=iterations) / iterations
+        data = serialize_dataframe(frame)
+        default_size = len(dumps(data))
+        columnar_size = len(dumps(columnar(data)))
+        print(f"{name}: {before * 1e6:.0f} us -> {after * 1e6:.0f} us ({before / after:.1f}x), "
+              f"JSON {default_size} bytes default, {columnar_size} bytes columnar")
+
+if __name__ == "__main__":
+    main()
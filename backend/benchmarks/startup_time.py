@@ -0,0 +1,59 @@
+"""Measure cold-start time to first byte for GET /categories.
+
+Run from the backend directory:
+
+    python benchmarks/startup_time.py [runs]
+
+Each run starts a fresh uvicorn process and polls /categories until it
+answers, reporting the time from process launch to the first response. The
+sentiment model keeps loading in the background, so this should not depend
+on the model size.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def time_to_first_byte(timeout: float = 120) -> float:
+    port = free_port()
+    env = dict(os.environ)
+    env.setdefault("YOUTUBE_API_KEY", "benchmark")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/categories", timeout=1) as response:
+                    response.read(1)
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("/categories did not respond")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    timings = [time_to_first_byte() for _ in range(runs)]
+    for i, seconds in enumerate(timings, 1):
+        print(f"run {i}: {seconds * 1000:.0f} ms")
+    print(f"best: {min(timings) * 1000:.0f} ms, mean: {sum(timings) / len(timings) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
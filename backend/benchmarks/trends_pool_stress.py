@@ -0,0 +1,76 @@
+"""Stress the TrendReq session pool with concurrent, distinct keywords.
+
+Run from the backend directory:
+
+    python benchmarks/trends_pool_stress.py [requests] [pool_size]
+
+Uses a stand-in for TrendReq that, like the real one, keeps the payload on the
+session object and answers after a random delay. Every fetch must come back
+with only its own keyword; with a single shared session (pool_size 0 runs
+that way) results cross between keywords.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ["SENTIMENT_PRELOAD"] = "0"
+# Measure the pool, not the Google Trends rate limiter
+os.environ["TRENDS_RATE_PER_SECOND"] = "1000"
+os.environ["TRENDS_BURST"] = "1000"
+
+import pandas as pd
+
+class FakeTrendReq:
+    """Same stateful build_payload/interest_* protocol as pytrends.TrendReq."""
+
+    def __init__(self):
+        self.kw_list = []
+
+    def build_payload(self, kw_list, cat=0, timeframe='today 12-m', geo='', gprop=''):
+        self.kw_list = list(kw_list)
+        time.sleep(random.uniform(0, 0.01))
+
+    def interest_over_time(self):
+        time.sleep(random.uniform(0, 0.01))
+        index = pd.date_range('2024-01-07', periods=52, freq='W')
+        return pd.DataFrame({kw: range(52) for kw in self.kw_list}, index=index)
+
+    def interest_by_region(self, resolution='COUNTRY', inc_low_vol=False, inc_geo_code=False):
+        time.sleep(random.uniform(0, 0.01))
+        return pd.DataFrame({kw: [50, 60] for kw in self.kw_list}, index=['Texas', 'Ohio'])
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    pool_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    import main as app_main
+    from trends_pool import TrendReqPool
+
+    if pool_size > 0:
+        app_main.trends_pool = TrendReqPool(size=pool_size, factory=FakeTrendReq)
+    else:
+        shared = FakeTrendReq()
+        app_main.trends_pool = TrendReqPool(size=1000, factory=lambda: shared)
+
+    def fetch(i: int) -> bool:
+        keyword = f"keyword {i}"
+        result, _, _ = app_main.fetch_trends(71, keyword, "today 12-m", "US")
+        return (list(result["interest_over_time"]) == [keyword]
+                and list(result["interest_by_region"]) == [keyword])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        correct = sum(executor.map(fetch, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{requests} concurrent fetches, pool size {pool_size or 'shared session'}: "
+          f"{correct} correct, {requests - correct} crossed, {elapsed:.2f}s")
+    print(app_main.trends_pool.stats())
+    sys.exit(0 if correct == requests else 1)
+
+if __name__ == "__main__":
+    main()
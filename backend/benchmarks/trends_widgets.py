@@ -0,0 +1,71 @@
+"""Benchmark fetching the two trends widgets concurrently vs sequentially.
+
+Run from the backend directory:
+
+    python benchmarks/trends_widgets.py [widget_latency_ms] [runs]
+
+Uses a local stand-in for TrendReq where build_payload and each widget take a
+fixed latency, and compares fetch_trends with calling the widgets one after
+the other as get_trends used to.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ["SENTIMENT_PRELOAD"] = "0"
+# Measure the widget fetches, not the Google Trends rate limiter
+os.environ["TRENDS_RATE_PER_SECOND"] = "1000"
+os.environ["TRENDS_BURST"] = "1000"
+
+import pandas as pd
+
+LATENCY = 0.2
+
+class StubTrendReq:
+    def build_payload(self, kw_list, cat=0, timeframe='today 12-m', geo='', gprop=''):
+        self.kw_list = list(kw_list)
+        time.sleep(LATENCY)
+
+    def interest_over_time(self):
+        time.sleep(LATENCY)
+        index = pd.date_range('2024-01-07', periods=52, freq='W')
+        return pd.DataFrame({kw: range(52) for kw in self.kw_list}, index=index)
+
+    def interest_by_region(self, resolution='COUNTRY', inc_low_vol=False, inc_geo_code=False):
+        time.sleep(LATENCY)
+        return pd.DataFrame({kw: [50, 60] for kw in self.kw_list}, index=['Texas', 'Ohio'])
+
+def sequential(keyword: str):
+    session = StubTrendReq()
+    session.build_payload([keyword], cat=71, timeframe="today 12-m", geo="US")
+    session.interest_over_time()
+    session.interest_by_region(resolution='REGION', inc_low_vol=True)
+
+def main():
+    global LATENCY
+    LATENCY = (float(sys.argv[1]) if len(sys.argv) > 1 else 200) / 1000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    import main as app_main
+    from trends_pool import TrendReqPool
+    app_main.trends_pool = TrendReqPool(size=1, factory=StubTrendReq)
+
+    started = time.perf_counter()
+    for i in range(runs):
+        sequential(f"keyword {i}")
+    before = (time.perf_counter() - started) / runs
+
+    started = time.perf_counter()
+    for i in range(runs):
+        _, _, timings = app_main.fetch_trends(71, f"keyword {i}", "today 12-m", "US")
+    after = (time.perf_counter() - started) / runs
+
+    print(f"widget latency {LATENCY * 1000:.0f} ms, {runs} runs")
+    print(f"sequential: {before * 1000:.0f} ms per fetch")
+    print(f"concurrent: {after * 1000:.0f} ms per fetch ({(1 - after / before):.0%} faster)")
+    print(f"last Server-Timing: {app_main.server_timing(timings)}")
+
+if __name__ == "__main__":
+    main()
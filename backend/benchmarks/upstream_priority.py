@@ -0,0 +1,96 @@
+"""Measure interactive trends latency while background jobs compete for Google Trends.
+
+Run from the backend directory:
+
+    python benchmarks/upstream_priority.py [bulk_jobs] [interactive_requests]
+
+Uses a stand-in for TrendReq that answers every call after a fixed delay.
+Batch exports (bulk) and cache warming (prefetch) queue many distinct keywords
+while interactive requests arrive one at a time; each interactive request's
+latency is reported with everything in one FIFO class and with the priority
+classes of trends_queue.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+os.environ["SENTIMENT_PRELOAD"] = "0"
+os.environ["TRENDS_STORE_DB"] = ""
+# Measure the queue, not the Google Trends rate limiter
+os.environ["TRENDS_RATE_PER_SECOND"] = "1000"
+os.environ["TRENDS_BURST"] = "1000"
+os.environ["UPSTREAM_QUEUE_TIMEOUT"] = "300"
+
+import numpy as np
+import pandas as pd
+
+CALL_SECONDS = 0.02
+
+class FakeTrendReq:
+    def build_payload(self, kw_list, cat=0, timeframe='today 12-m', geo='', gprop=''):
+        self.keyword = kw_list[0]
+        time.sleep(CALL_SECONDS)
+
+    def interest_over_time(self):
+        time.sleep(CALL_SECONDS)
+        index = pd.date_range('2024-01-07', periods=52, freq='W', name='date')
+        frame = pd.DataFrame({self.keyword: np.arange(52)}, index=index)
+        frame['isPartial'] = False
+        return frame
+
+    def interest_by_region(self, resolution='COUNTRY', inc_low_vol=False, inc_geo_code=False):
+        time.sleep(CALL_SECONDS)
+        return pd.DataFrame({self.keyword: [50, 60]}, index=pd.Index(['Texas', 'Ohio'], name='geoName'))
+
+def run(app_main, bulk_jobs: int, interactive: int, classes: bool):
+    from trends_cache import TrendsCache
+    from trends_pool import TrendReqPool
+    from upstream_queue import UpstreamQueue
+    app_main.trends_pool = TrendReqPool(size=4, factory=FakeTrendReq)
+    app_main.trends_cache = TrendsCache()
+    app_main.trends_queue = UpstreamQueue("Google Trends", 4)
+
+    def background(index: int):
+        priority = ("bulk" if index % 3 else "prefetch") if classes else "interactive"
+        try:
+            app_main.cached_trends(71, f"background {index}", "today 12-m", "US", priority)
+        except app_main.UpstreamUnavailable:
+            return "preempted"
+        return "done"
+
+    def user(index: int) -> float:
+        started = time.perf_counter()
+        app_main.cached_trends(71, f"user {index}", "today 12-m", "US")
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=bulk_jobs) as background_pool, \
+            ThreadPoolExecutor(max_workers=interactive) as user_pool:
+        backgrounds = [background_pool.submit(background, i) for i in range(bulk_jobs)]
+        time.sleep(0.05)
+        users = []
+        for i in range(interactive):
+            users.append(user_pool.submit(user, i))
+            time.sleep(CALL_SECONDS)
+        latencies = np.array([future.result() for future in users]) * 1000
+        outcomes = [future.result() for future in backgrounds]
+
+    label = "priority classes" if classes else "single FIFO     "
+    print(f"{label}: interactive p50 {np.percentile(latencies, 50):.0f} ms, "
+          f"max {latencies.max():.0f} ms; background preempted {outcomes.count('preempted')}/{bulk_jobs}")
+    return app_main.trends_queue.stats()
+
+def main():
+    bulk_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    interactive = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    import main as app_main
+    run(app_main, bulk_jobs, interactive, classes=False)
+    stats = run(app_main, bulk_jobs, interactive, classes=True)
+    for priority in ("interactive", "prefetch", "bulk"):
+        print(f"  {priority}: {stats[priority]}")
+
+if __name__ == "__main__":
+    main()
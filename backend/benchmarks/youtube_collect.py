@@ -0,0 +1,83 @@
+"""Compare one-page YouTube snapshots with paginated collection.
+
+Run from the backend directory:
+
+    python benchmarks/youtube_collect.py [upstream_delay_ms] [max_pages]
+
+Uses an in-process stand-in for the YouTube client whose search pages (50
+results each, with nextPageToken) mix English titles containing the keyword
+with other languages and unrelated titles, like real results for niche CPG
+keywords. Reports the titles available to the sentiment and tags analyses,
+search pages, quota units and latency, collecting one page (as before) and
+up to max_pages.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TITLES = [
+    "{keyword} taste test: which brand wins?",
+    "Probando {keyword} por primera vez",
+    "Top 10 grocery hauls of the week",
+    "{keyword} - ce que personne ne vous dit",
+    "Is {keyword} actually healthy? A dietitian explains",
+    "Unboxing the new kitchen gadgets",
+    "{keyword} ranking im großen Test",
+    "How {keyword} is made in a factory",
+]
+
+class FakeYouTube:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def search(self, q, pageToken=None, maxResults=50, **params):
+        await asyncio.sleep(self.delay)
+        keyword = q.strip('"')
+        page = int(pageToken or 0)
+        items = []
+        for i in range(page * maxResults, (page + 1) * maxResults):
+            title = TITLES[i % len(TITLES)].format(keyword=keyword) + f" #{i}"
+            items.append({"id": {"videoId": f"video{i}"}, "snippet": {"title": title}})
+        response = {"items": items}
+        if page < 9:
+            response["nextPageToken"] = str(page + 1)
+        return response
+
+    async def videos(self, id, **params):
+        await asyncio.sleep(self.delay)
+        return {"items": [
+            {"id": video_id, "snippet": {"title": "", "channelTitle": "", "thumbnails": {"default": {"url": ""}}}}
+            for video_id in id.split(",")
+        ]}
+
+async def collect(delay: float, max_pages: int):
+    from youtube_quota import YouTubeQuotaLedger
+    from youtube_snapshot import YouTubeSnapshotStore
+
+    quota = YouTubeQuotaLedger()
+    store = YouTubeSnapshotStore(FakeYouTube(delay), quota=quota, collect_max_pages=max_pages)
+    started = time.perf_counter()
+    snapshot = await store.get("oat milk")
+    elapsed = time.perf_counter() - started
+    titles = {result.title for result in snapshot.results}
+    qualifying = [title for title in titles if "oat milk" in title.lower() and snapshot.is_english(title)]
+    return len(qualifying), store.stats()["search_pages"], quota.stats()["spent"], elapsed
+
+def main():
+    delay = (float(sys.argv[1]) if len(sys.argv) > 1 else 100) / 1000
+    max_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    # Load the language profiles up front so their one-off cost is not timed
+    from youtube_snapshot import is_english
+    is_english("warm up")
+
+    for label, pages in (("one page", 1), (f"up to {max_pages} pages", max_pages)):
+        titles, fetched, units, elapsed = asyncio.run(collect(delay, pages))
+        print(f"{label:>14}: {titles} qualifying titles from {fetched} search pages, "
+              f"{units} quota units, {elapsed * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
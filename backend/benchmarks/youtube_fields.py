@@ -0,0 +1,133 @@
+"""Measure what the partial-response `fields` masks save on YouTube API responses.
+
+Run from the backend directory:
+
+    python benchmarks/youtube_fields.py [search.json videos.json] [iterations]
+
+Takes full (unmasked) responses recorded from the API, e.g. with
+
+    curl "https://www.googleapis.com/youtube/v3/search?part=snippet&type=video&maxResults=50&q=coffee&key=$KEY" > search.json
+    curl "https://www.googleapis.com/youtube/v3/videos?part=snippet,statistics&id=<ids>&key=$KEY" > videos.json
+
+or, without files, responses built to the documented shape (50 results, full
+snippets with descriptions, every thumbnail size, tags and localizations).
+Applies YOUTUBE_SEARCH_FIELDS / YOUTUBE_VIDEO_FIELDS the way the API does and
+reports response bytes and the time to decode them and build the snapshot
+records, checking the records are identical either way.
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_snapshot import YOUTUBE_SEARCH_FIELDS, YOUTUBE_VIDEO_FIELDS, SearchResult, VideoDetails
+
+def _selector(mask: str, i: int, tree: dict) -> int:
+    j = i
+    while j < len(mask) and mask[j] not in ',()/':
+        j += 1
+    node = tree.setdefault(mask[i:j], {})
+    if j < len(mask) and mask[j] == '/':
+        return _selector(mask, j + 1, node)
+    if j < len(mask) and mask[j] == '(':
+        return _selectors(mask, j + 1, node) + 1
+    return j
+
+def _selectors(mask: str, i: int, tree: dict) -> int:
+    i = _selector(mask, i, tree)
+    while i < len(mask) and mask[i] == ',':
+        i = _selector(mask, i + 1, tree)
+    return i
+
+def parse_fields(mask: str) -> dict:
+    tree = {}
+    _selectors(mask, 0, tree)
+    return tree
+
+def apply_fields(value, tree: dict):
+    """The value with only the selected fields, as the API returns it for a `fields` mask."""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(item, tree) for item in value]
+    return {key: apply_fields(value[key], sub) for key, sub in tree.items() if key in value}
+
+def thumbnails(video_id: str) -> dict:
+    sizes = {"default": (120, 90), "medium": (320, 180), "high": (480, 360), "standard": (640, 480), "maxres": (1280, 720)}
+    return {name: {"url": f"https://i.ytimg.com/vi/{video_id}/{name}.jpg", "width": w, "height": h}
+            for name, (w, h) in sizes.items()}
+
+def documented_responses(count: int = 50) -> tuple[dict, dict]:
+    description = ("Today we compare every brand of oat milk at the store, from barista editions to budget "
+                   "cartons, and rank them on taste, texture and price. ") * 10
+    search, videos = {"kind": "youtube#searchListResponse", "etag": "x" * 27, "nextPageToken": "CDIQAA",
+                      "regionCode": "US", "pageInfo": {"totalResults": 1000000, "resultsPerPage": count},
+                      "items": []}, {"kind": "youtube#videoListResponse", "etag": "y" * 27, "items": [],
+                                     "pageInfo": {"totalResults": count, "resultsPerPage": count}}
+    for i in range(count):
+        video_id = f"vid{i:08d}"
+        snippet = {
+            "publishedAt": f"2024-{i % 12 + 1:02d}-01T12:00:00Z",
+            "channelId": f"UC{i:022d}",
+            "title": f"Oat milk taste test #{i}: which brand is best?",
+            "description": description[:160],
+            "thumbnails": {name: thumb for name, thumb in thumbnails(video_id).items() if name in ("default", "medium", "high")},
+            "channelTitle": f"Kitchen Channel {i}",
+            "liveBroadcastContent": "none",
+            "publishTime": f"2024-{i % 12 + 1:02d}-01T12:00:00Z"
+        }
+        search["items"].append({"kind": "youtube#searchResult", "etag": "e" * 27,
+                                "id": {"kind": "youtube#video", "videoId": video_id}, "snippet": snippet})
+        videos["items"].append({
+            "kind": "youtube#video", "etag": "f" * 27, "id": video_id,
+            "snippet": {
+                **{key: snippet[key] for key in ("publishedAt", "channelId", "title", "channelTitle", "liveBroadcastContent")},
+                "description": description,
+                "thumbnails": thumbnails(video_id),
+                "tags": ["oat milk", "taste test", "plant based", "dairy free", "barista", "review", "vegan", f"brand {i % 7}"],
+                "categoryId": "26",
+                "defaultAudioLanguage": "en",
+                "localized": {"title": snippet["title"], "description": description}
+            },
+            "statistics": {"viewCount": str(1000 * (i + 1)), "likeCount": str(40 * (i + 1)),
+                           "favoriteCount": "0", "commentCount": str(3 * (i + 1))}
+        })
+    return search, videos
+
+def records(search_body: bytes, videos_body: bytes) -> tuple[list, list]:
+    search, videos = json.loads(search_body), json.loads(videos_body)
+    return [SearchResult(item) for item in search["items"]], [VideoDetails(item) for item in videos["items"]]
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.isdigit()]
+    iterations = int(next((arg for arg in sys.argv[1:] if arg.isdigit()), 500))
+    if len(args) >= 2:
+        with open(args[0]) as search_file, open(args[1]) as videos_file:
+            search, videos = json.load(search_file), json.load(videos_file)
+        source = f"recorded {args[0]} and {args[1]}"
+    else:
+        search, videos = documented_responses()
+        source = "documented-shape responses"
+
+    full = (json.dumps(search).encode(), json.dumps(videos).encode())
+    masked = (json.dumps(apply_fields(search, parse_fields(YOUTUBE_SEARCH_FIELDS))).encode(),
+              json.dumps(apply_fields(videos, parse_fields(YOUTUBE_VIDEO_FIELDS))).encode())
+
+    def slots(objects):
+        return [[getattr(obj, name) for name in obj.__slots__] for obj in objects]
+
+    assert all(slots(a) == slots(b) for a, b in zip(records(*full), records(*masked))), "records differ"
+
+    full_time = timeit.timeit(lambda: records(*full), number=iterations) / iterations
+    masked_time = timeit.timeit(lambda: records(*masked), number=iterations) / iterations
+    print(f"{source}, {len(search['items'])} results:")
+    for label, (search_body, videos_body), elapsed in (("full", full, full_time), ("fields", masked, masked_time)):
+        print(f"{label:>7}: search {len(search_body):>7} bytes, videos {len(videos_body):>7} bytes, "
+              f"decode + records {elapsed * 1000:.3f} ms")
+    saved = 1 - sum(map(len, masked)) / sum(map(len, full))
+    print(f"{saved:.0%} fewer bytes, {full_time / masked_time:.1f}x faster to decode")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Load test the YouTube endpoints against a local fake YouTube Data API.
+
+Run from the backend directory:
+
+    python benchmarks/youtube_load.py [concurrent_requests] [upstream_delay_ms]
+
+The fake server answers /search and /videos after a fixed delay. If requests
+overlap, N concurrent calls to /youtube/top-videos (one keyword each, so no
+snapshot is shared) finish in roughly the time of one (two upstream round
+trips) instead of N times that.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def fake_video(i: int, keyword: str) -> dict:
+    return {
+        "id": f"video{i}",
+        "snippet": {
+            "title": f"{keyword} review number {i}",
+            "description": f"All about {keyword}",
+            "channelTitle": f"Channel {i}",
+            "publishedAt": "2024-01-01T00:00:00Z",
+            "tags": [f"tag{i % 7}", "cpg"],
+            "thumbnails": {"default": {"url": f"https://i.ytimg.com/vi/video{i}/default.jpg"}}
+        },
+        "statistics": {"viewCount": str(1000 * i)}
+    }
+
+def fake_server(delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            time.sleep(delay)
+            if url.path.endswith("/search"):
+                keyword = params["q"][0].strip('"')
+                count = int(params.get("maxResults", ["5"])[0])
+                items = [{"id": {"videoId": f"video{i}"}, "snippet": fake_video(i, keyword)["snippet"]}
+                         for i in range(count)]
+                body = {"items": items}
+            else:
+                ids = params["id"][0].split(",")
+                body = {"items": [fake_video(int(video_id[5:]), "coffee") for video_id in ids]}
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 128
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def run(concurrency: int, delay: float):
+    import httpx
+    import main
+
+    # Warm up language detection so its one-off profile loading is not timed
+    main.DetectorFactory.seed = 0
+    from youtube_snapshot import is_english
+    is_english("warm up")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.get(f"/youtube/top-videos/coffee {i}") for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+    await main.youtube.aclose()
+
+    assert all(response.status_code == 200 for response in responses), responses[0].text
+    serial = concurrency * 2 * delay
+    print(f"{concurrency} concurrent requests, {delay * 1000:.0f} ms upstream delay")
+    print(f"elapsed: {elapsed * 1000:.0f} ms (fully serialized would be >= {serial * 1000:.0f} ms)")
+    print(f"overlap factor: {serial / elapsed:.1f}x")
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+
+    server = fake_server(delay)
+    os.environ["YOUTUBE_API_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/youtube/v3"
+    os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+    os.environ["SENTIMENT_PRELOAD"] = "0"
+    try:
+        asyncio.run(run(concurrency, delay))
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from typing import Dict, Any, Callable, Awaitable, List, Optional
+import asyncio
+import os
+import threading
+import time
+
+# Background warming of the trends and YouTube caches for the catalog keywords
+CACHE_WARM_ENABLED = os.getenv('CACHE_WARM_ENABLED', '1') == '1'
+CACHE_WARM_INTERVAL = float(os.getenv('CACHE_WARM_INTERVAL', '1800'))
+CACHE_WARM_INITIAL_DELAY = float(os.getenv('CACHE_WARM_INITIAL_DELAY', '30'))
+# Most refreshes per cycle; a YouTube search costs 100 units of the daily API quota,
+# so only keywords people actually looked at recently are warmed there
+CACHE_WARM_TRENDS_BUDGET = int(os.getenv('CACHE_WARM_TRENDS_BUDGET', '20'))
+CACHE_WARM_YOUTUBE_BUDGET = int(os.getenv('CACHE_WARM_YOUTUBE_BUDGET', '2'))
+# YouTube snapshots expire sooner than the interval, so YouTube warm-ups run this
+# fraction of the snapshot TTL apart and refresh popular snapshots before they go stale
+CACHE_WARM_YOUTUBE_TTL_FRACTION = float(os.getenv('CACHE_WARM_YOUTUBE_TTL_FRACTION', '0.8'))
+# Requests for a keyword count half as much after this many seconds
+CACHE_WARM_POPULARITY_HALF_LIFE = float(os.getenv('CACHE_WARM_POPULARITY_HALF_LIFE', str(6 * 3600)))
+
+class Popularity:
+    """Request counts per keyword that decay exponentially with a given half-life."""
+
+    def __init__(self, half_life: float = CACHE_WARM_POPULARITY_HALF_LIFE):
+        self.half_life = max(1.0, half_life)
+        self._scores: Dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def record(self, keyword: str):
+        key = keyword.strip().lower()
+        now = time.time()
+        with self._lock:
+            score, updated = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, updated, now) + 1, now)
+
+    def score(self, keyword: str) -> float:
+        with self._lock:
+            entry = self._scores.get(keyword.strip().lower())
+        return self._decayed(*entry, time.time()) if entry is not None else 0.0
+
+class CacheWarmer:
+    """Periodically refreshes catalog entries that would otherwise go stale before the next cycle.
+
+    Every `interval` it asks `trends_jobs` for (label, seconds until stale,
+    keyword, refresh) tuples, and every `youtube_interval` (at most the
+    interval, since snapshots live shorter than trends entries) it asks
+    `youtube_jobs` for (seconds until stale, keyword, warm) tuples. Jobs
+    expiring before their next cycle are ordered by the keyword's recent
+    popularity and at most the budget of each is run, one at a time; YouTube
+    warm-ups refetch snapshots that are still fresh. Trends refreshes are
+    blocking and run in a worker thread. Each half stops early once its
+    upstream reports it is unavailable, which includes warm-ups preempted by
+    interactive requests.
+    """
+
+    def __init__(self, trends_jobs: Callable[[], List[tuple[str, float, str, Callable[[], Any]]]],
+                 youtube_jobs: Callable[[], List[tuple[float, str, Callable[[], Awaitable[Any]]]]],
+                 popularity: Popularity, interval: float = CACHE_WARM_INTERVAL,
+                 trends_budget: int = CACHE_WARM_TRENDS_BUDGET, youtube_budget: int = CACHE_WARM_YOUTUBE_BUDGET,
+                 initial_delay: float = CACHE_WARM_INITIAL_DELAY, unavailable: tuple = (),
+                 youtube_interval: Optional[float] = None):
+        self.trends_jobs = trends_jobs
+        self.youtube_jobs = youtube_jobs
+        self.popularity = popularity
+        self.interval = max(1.0, interval)
+        self.youtube_interval = max(1.0, min(self.interval, youtube_interval or self.interval))
+        self.trends_budget = max(0, trends_budget)
+        self.youtube_budget = max(0, youtube_budget)
+        self.initial_delay = initial_delay
+        self.unavailable = unavailable
+        self._task: Optional[asyncio.Task] = None
+        self._cycles = 0
+        self._youtube_cycles = 0
+        self._trends_warmed = 0
+        self._youtube_warmed = 0
+        self._errors = 0
+        self._last_due = 0
+        self._last_youtube_due = 0
+        self._last_cycle_at: Optional[float] = None
+        self._last_cycle_seconds = 0.0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        await asyncio.sleep(self.initial_delay)
+        loop = asyncio.get_running_loop()
+        # [next run, interval, warm-up] per cache
+        schedule = [[loop.time(), self.interval, self.warm_trends],
+                    [loop.time(), self.youtube_interval, self.warm_youtube]]
+        while True:
+            for job in schedule:
+                if loop.time() < job[0]:
+                    continue
+                job[0] = loop.time() + job[1]
+                try:
+                    await job[2]()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._errors += 1
+                    print(f"Error warming caches: {str(e)}")
+            await asyncio.sleep(max(0.0, min(job[0] for job in schedule) - loop.time()))
+
+    async def run_cycle(self):
+        """Warm both caches once, regardless of their schedules."""
+        await self.warm_trends()
+        await self.warm_youtube()
+
+    async def warm_trends(self):
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        trends = [job for job in await loop.run_in_executor(None, self.trends_jobs) if job[1] < self.interval]
+        trends.sort(key=lambda job: -self.popularity.score(job[2]))
+        self._last_due = len(trends)
+
+        for label, _, _, refresh in trends[:self.trends_budget]:
+            try:
+                await loop.run_in_executor(None, refresh)
+                self._trends_warmed += 1
+            except self.unavailable as e:
+                print(f"Stopping trends warm-up, upstream unavailable: {str(e)}")
+                break
+            except Exception as e:
+                self._errors += 1
+                print(f"Error warming trends for {label}: {str(e)}")
+
+        self._cycles += 1
+        self._last_cycle_at = time.time()
+        self._last_cycle_seconds = time.perf_counter() - started
+
+    async def warm_youtube(self):
+        youtube = [job for job in self.youtube_jobs()
+                   if job[0] < self.youtube_interval and self.popularity.score(job[1]) > 0]
+        youtube.sort(key=lambda job: -self.popularity.score(job[1]))
+        self._last_youtube_due = len(youtube)
+
+        for _, keyword, warm in youtube[:self.youtube_budget]:
+            try:
+                await warm()
+                self._youtube_warmed += 1
+            except self.unavailable as e:
+                print(f"Stopping YouTube warm-up, upstream unavailable: {str(e)}")
+                break
+            except Exception as e:
+                self._errors += 1
+                print(f"Error warming YouTube for {keyword}: {str(e)}")
+        self._youtube_cycles += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "youtube_interval": self.youtube_interval,
+            "trends_budget": self.trends_budget,
+            "youtube_budget": self.youtube_budget,
+            "cycles": self._cycles,
+            "youtube_cycles": self._youtube_cycles,
+            "last_due": self._last_due,
+            "last_youtube_due": self._last_youtube_due,
+            "last_cycle_age": round(time.time() - self._last_cycle_at, 1) if self._last_cycle_at else None,
+            "last_cycle_seconds": round(self._last_cycle_seconds, 2),
+            "trends_warmed": self._trends_warmed,
+            "youtube_warmed": self._youtube_warmed,
+            "errors": self._errors
+        }
@@ -0,0 +1,128 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+import gzip
+import hashlib
+import os
+
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+import numpy as np
+import orjson
+import pandas as pd
+
+# brotli is optional; without it clients get gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '5'))
+
+def encode_default(obj: Any) -> Any:
+    """Fallback for values orjson does not encode itself (object arrays, NumPy scalars, timestamps)."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Encode to JSON with NumPy arrays written directly, without converting them to lists first."""
+    return orjson.dumps(content, default=encode_default, option=JSON_OPTIONS)
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson-backed response that also accepts NumPy arrays, NumPy scalars and pandas timestamps.
+
+    Endpoints that return NumPy data must return this response themselves:
+    FastAPI runs returned dicts through jsonable_encoder first, which only
+    understands plain Python types.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+# Content codings a payload may be sent with; each gets its own strong ETag
+CONTENT_CODINGS = ("br", "gzip")
+
+class EncodedPayload:
+    """A JSON body encoded once, with its strong ETags and compressed variants built on first use."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._encoded: Dict[str, bytes] = {}
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong validators must differ between content codings, so compressed variants get a suffix."""
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    @classmethod
+    def of(cls, content: Any) -> "EncodedPayload":
+        return cls(dumps(content))
+
+    def encoded(self, encoding: str) -> bytes:
+        body = self._encoded.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.body, quality=BROTLI_QUALITY)
+            else:
+                body = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+            self._encoded[encoding] = body
+        return body
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header (highest q wins, br on ties)."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_weight = None, 0.0
+    for encoding in supported:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+def etag_matches(if_none_match: str, payload: EncodedPayload) -> bool:
+    """Whether If-None-Match names any coding's variant of the payload."""
+    if if_none_match.strip() == "*":
+        return True
+    variants = {payload.etag_for(None)} | {payload.etag_for(encoding) for encoding in CONTENT_CODINGS}
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    return any(tag.strip().removeprefix("W/") in variants for tag in if_none_match.split(","))
+
+def payload_response(request: Request, payload: EncodedPayload, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Send a payload with its ETag, as 304 if the client already has it, compressed if accepted.
+
+    Cache-Control: no-cache lets browsers keep the body but makes them
+    revalidate it with If-None-Match on every dashboard refresh.
+    """
+    encoding = None
+    if len(payload.body) >= COMPRESS_MIN_SIZE:
+        encoding = accepted_encoding(request.headers.get("accept-encoding", ""))
+    headers = {**(headers or {}), "ETag": payload.etag_for(encoding), "Vary": "Accept-Encoding",
+               "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), payload):
+        return Response(status_code=304, headers=headers)
+
+    body = payload.body
+    if encoding is not None:
+        body = payload.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
@@ -1,22 +1,45 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pytrends.request import TrendReq
-from typing import List, Optional, Dict, Any
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional, Dict, Any, Callable
 from datetime import datetime, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from pytrends.request import TrendReq
 import pandas as pd
 import json
-from googleapiclient.discovery import build
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
 import numpy as np
-from langdetect import detect, DetectorFactory
+from langdetect import DetectorFactory
 import os
+import secrets
+import time
+import asyncio
 from dotenv import load_dotenv
+from sentiment import SENTIMENT_PRELOAD, start_loading, wait_until_loaded_async, model_status
+from sentiment_batcher import sentiment_batcher
+from sentiment_cache import sentiment_cache
+from trends_cache import CacheEntry, TrendsCache, ttl_for
+from trends_compare import TRENDS_COMPARE_MAX_KEYWORDS, TRENDS_PAYLOAD_KEYWORDS, anchor_groups, canonical_keywords, merge_over_time, merge_by_region, unplaced_keywords, volume_anchor
+from singleflight import SingleFlight
+from json_response import FastJSONResponse, EncodedPayload, dumps, payload_response
+from trends_store import TrendsStore
+from trends_incremental import (
+    TRENDS_INCREMENTAL_TIMEFRAMES, TRENDS_INCREMENTAL_WINDOW_DAYS, TRENDS_INCREMENTAL_MAX_AGE, SeriesExtender
+)
+from trends_pool import TrendReqPool, TRENDS_POOL_SIZE
+from upstream import UpstreamScheduler, UpstreamUnavailable
+from upstream_queue import UpstreamPreempted, UpstreamQueue
+from youtube_client import AsyncYouTubeClient, YOUTUBE_MAX_CONNECTIONS
+from youtube_snapshot import YouTubeSnapshot, YouTubeSnapshotStore
+from youtube_quota import YouTubeQuotaLedger
+from cache_warmer import CACHE_WARM_ENABLED, CACHE_WARM_YOUTUBE_TTL_FRACTION, CacheWarmer, Popularity
+from starlette.concurrency import run_in_threadpool
 
 # Load environment variables from .env file if it exists
 load_dotenv()
 
-app = FastAPI(title="CPG Trends API")
+app = FastAPI(title="CPG Trends API", default_response_class=FastJSONResponse)
 
 # Get allowed origins from environment variable or use default
 allowed_origins = [
@@ -33,36 +56,72 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize pytrends
-pytrends = TrendReq(hl='en-US', tz=360)
+# Cache of Google Trends responses, keyed by (category id, keyword, timeframe, geo)
+trends_cache = TrendsCache()
+
+# Every complete series fetch, kept on disk so restarts start with a warm cache
+trends_store = TrendsStore()
+
+# Appends recent windows to long cached series (see fetch_trends_incremental)
+series_extender = SeriesExtender()
+
+# Identical concurrent trends fetches share one upstream call
+trends_flight = SingleFlight()
+
+# Rate limiting, 429 backoff and circuit breaking for every Google Trends call
+trends_scheduler = UpstreamScheduler()
+
+# Pool of pytrends sessions; each request checks one out for its whole payload
+trends_pool = TrendReqPool(scheduler=trends_scheduler)
+
+# Trends fetches queue here by priority class, so warming and batch exports
+# only use the sessions interactive requests leave free
+trends_queue = UpstreamQueue("Google Trends", TRENDS_POOL_SIZE)
+
+# Items of a POST /trends/batch request fetched at once, and the most items per request
+TRENDS_BATCH_CONCURRENCY = int(os.getenv('TRENDS_BATCH_CONCURRENCY', '2'))
+TRENDS_BATCH_MAX_ITEMS = int(os.getenv('TRENDS_BATCH_MAX_ITEMS', '100'))
+
+# Runs the two widgets of each payload side by side
+widget_executor = ThreadPoolExecutor(max_workers=2 * TRENDS_POOL_SIZE, thread_name_prefix="trends-widget")
+
+# Fetches the anchor groups of a large comparison in parallel, one pooled session each
+compare_executor = ThreadPoolExecutor(max_workers=TRENDS_POOL_SIZE, thread_name_prefix="trends-compare")
 
 # Initialize YouTube API
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
 if not YOUTUBE_API_KEY:
     raise ValueError("YouTube API key not found in environment variables. Please set YOUTUBE_API_KEY.")
 
-try:
-    youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
-except Exception as e:
-    print(f"Warning: Failed to initialize YouTube API: {str(e)}")
-    youtube = None
-
-# Initialize sentiment model
-model_name = "cardiffnlp/twitter-roberta-base-sentiment"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSequenceClassification.from_pretrained(model_name)
+youtube = AsyncYouTubeClient(YOUTUBE_API_KEY)
+# YouTube searches queue by priority class like trends fetches
+youtube_queue = UpstreamQueue("YouTube", YOUTUBE_MAX_CONNECTIONS)
+# Daily YouTube quota spent, which decides when to serve stale snapshots instead
+youtube_quota = YouTubeQuotaLedger()
+youtube_snapshots = YouTubeSnapshotStore(youtube, queue=youtube_queue, quota=youtube_quota)
 
 # Fix seed for consistent language detection
 DetectorFactory.seed = 0
 
-# Helper function for sentiment analysis
-def classify_sentiment(text: str) -> tuple[str, float]:
-    inputs = tokenizer(text, return_tensors="pt", truncation=True)
-    outputs = model(**inputs)
-    scores = outputs.logits.detach().numpy()[0]
-    probs = np.exp(scores) / np.sum(np.exp(scores))  # softmax
-    labels = ["Negative", "Neutral", "Positive"]
-    return labels[np.argmax(probs)], float(np.max(probs))
+# How long a sentiment request waits for the model to finish loading
+SENTIMENT_READY_TIMEOUT = float(os.getenv('SENTIMENT_READY_TIMEOUT', '30'))
+
+# Recent requests per keyword, used to warm the most wanted catalog entries first
+keyword_popularity = Popularity()
+
+@app.on_event("startup")
+async def startup():
+    # Load the sentiment model without holding up the rest of the API
+    if SENTIMENT_PRELOAD:
+        start_loading()
+    if CACHE_WARM_ENABLED:
+        cache_warmer.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await cache_warmer.close()
+    await sentiment_batcher.close()
+    await youtube.aclose()
 
 # Valid timeframes
 VALID_TIMEFRAMES = [
@@ -160,6 +219,27 @@ CPG_CATEGORIES = {
     }
 }
 
+# State names as returned by Google Trends, mapped to the codes used by the map
+STATE_CODES = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
+    'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
+    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS',
+    'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH',
+    'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC',
+    'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA',
+    'Rhode Island': 'RI', 'South Carolina': 'SC', 'South Dakota': 'SD', 'Tennessee': 'TN',
+    'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
+    'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
+}
+STATE_NAMES = pd.Index(list(STATE_CODES))
+STATE_CODE_ARRAY = np.array(list(STATE_CODES.values()))
+
+# Response shapes for trends data: "default" keeps the original per-keyword
+# objects, "columnar" lists the dates (or regions) once next to per-keyword values
+VALID_FORMATS = ["default", "columnar"]
+
 def serialize_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
     """Helper function to serialize pandas DataFrame to JSON-compatible format."""
     if df is None or df.empty:
@@ -167,344 +247,858 @@ def serialize_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
     
     # For time series data
     if isinstance(df.index, pd.DatetimeIndex):
-        result = {}
-        for column in df.columns:
-            result[column] = {
-                'dates': df.index.strftime('%Y-%m-%d').tolist(),
-                'values': df[column].tolist()
-            }
-        return result
+        # Format the dates once (in local time); every column shares the same list.
+        # Values stay NumPy arrays, which json_response.dumps encodes directly.
+        index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        dates = np.datetime_as_string(index.values, unit='D').tolist()
+        return {
+            column: {'dates': dates, 'values': df[column].to_numpy()}
+            for column in df.columns
+        }
     
     # For regional data
-    else:
-        # Convert state names to state codes for the map
-        state_codes = {
-            'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
-            'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
-            'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
-            'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-            'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS',
-            'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH',
-            'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC',
-            'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA',
-            'Rhode Island': 'RI', 'South Carolina': 'SC', 'South Dakota': 'SD', 'Tennessee': 'TN',
-            'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
-            'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
+    # Convert state names to state codes for the map, dropping regions without one
+    positions = STATE_NAMES.get_indexer(df.index)
+    known = positions >= 0
+    codes = STATE_CODE_ARRAY[positions[known]].tolist()
+    values = np.nan_to_num(df.to_numpy(dtype=float)[known], nan=0).astype(int)
+    return {
+        column: dict(zip(codes, values[:, i].tolist()))
+        for i, column in enumerate(df.columns)
+    }
+
+def columnar(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Reshape serialize_dataframe output so the shared dates or regions appear once."""
+    if not data:
+        return {}
+    first = next(iter(data.values()))
+    if 'dates' in first:
+        return {
+            "dates": first['dates'],
+            "values": {column: series['values'] for column, series in data.items()}
         }
-        
-        result = {}
-        for col in df.columns:
-            # Convert state names to codes and create a mapping of values
-            state_values = {}
-            for state, value in df[col].items():
-                if state in state_codes:
-                    state_values[state_codes[state]] = int(value) if pd.notnull(value) else 0
-            result[col] = state_values
+    return {
+        "regions": list(first.keys()),
+        "values": {column: list(states.values()) for column, states in data.items()}
+    }
+
+def render_trends(result: Dict[str, Any], format: str) -> Dict[str, Any]:
+    """Shape a cached trends result for the response format asked for."""
+    if format != "columnar":
         return result
+    return {
+        **result,
+        "interest_over_time": columnar(result["interest_over_time"]),
+        "interest_by_region": columnar(result["interest_by_region"])
+    }
+
+def validate_format(format: str):
+    if format not in VALID_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Must be one of: {', '.join(VALID_FORMATS)}"
+        )
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to CPG Trends API"}
 
+@app.get("/ready")
+def get_ready():
+    # The sentiment model only backs the sentiment endpoints and may load lazily,
+    # so it is reported but does not hold back the instance
+    components = {
+        "sentiment_model": {**model_status(), "required": False},
+        "youtube": {"ready": youtube is not None, "required": True},
+        "google_trends": {"ready": True, "required": True, "sessions": trends_pool.stats()["created"]}
+    }
+    ready = all(component["ready"] for component in components.values() if component["required"])
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "components": components}
+    )
+
+@app.get("/metrics")
+def get_metrics():
+    return {
+        "sentiment_batcher": sentiment_batcher.stats(),
+        "sentiment_cache": sentiment_cache.stats(),
+        "youtube_snapshots": youtube_snapshots.stats(),
+        "youtube_quota": youtube_quota.summary(),
+        "trends_cache": trends_cache.stats(),
+        "trends_store": trends_store.stats(),
+        "trends_incremental": series_extender.stats(),
+        "trends_single_flight": trends_flight.stats(),
+        "trends_pool": trends_pool.stats(),
+        "trends_upstream": trends_scheduler.stats(),
+        "trends_queue": trends_queue.stats(),
+        "youtube_queue": youtube_queue.stats(),
+        "cache_warmer": cache_warmer.stats()
+    }
+
+# Token required by the /admin endpoints in an X-Admin-Token header, when set
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+def check_admin(request: Request):
+    # Admin endpoints stay closed unless a token is configured
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not secrets.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/admin/youtube-quota")
+def get_youtube_quota(request: Request):
+    """Today's YouTube API quota: units spent by endpoint, keyword and call, what is left and the current mode."""
+    check_admin(request)
+    return youtube_quota.stats()
+
 @app.get("/categories")
 def get_categories():
     return CPG_CATEGORIES
 
-@app.get("/trends/{category}/{keyword}")
-def get_trends(
-    category: str,
-    keyword: str,
-    timeframe: str = "today 12-m",
-    geo: str = "US"
-):
-    try:
-        # Validate timeframe
-        if timeframe not in VALID_TIMEFRAMES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timeframe. Must be one of: {', '.join(VALID_TIMEFRAMES)}"
-            )
-        
-        # Validate category
-        if category not in CPG_CATEGORIES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid category. Must be one of: {', '.join(CPG_CATEGORIES.keys())}"
-            )
-        
-        # Get category ID
-        cat_id = CPG_CATEGORIES[category]["id"]
-        
+def timed_call(fn) -> tuple[Any, float]:
+    """Run one Google Trends call through the scheduler, returning (result, milliseconds)."""
+    started = time.perf_counter()
+    result = trends_scheduler.call(fn)
+    return result, (time.perf_counter() - started) * 1000
+
+def fetch_widgets(pytrends: TrendReq, resolution: str) -> Dict[str, Future]:
+    """Fetch interest over time and interest by region for a built payload concurrently.
+
+    The two widgets read separate attributes of the TrendReq and pytrends opens
+    a new HTTP session per request, so both can share the checked-out session.
+    """
+    futures = {
+        "interest_over_time": widget_executor.submit(timed_call, pytrends.interest_over_time),
+        "interest_by_region": widget_executor.submit(
+            timed_call, lambda: pytrends.interest_by_region(resolution=resolution, inc_low_vol=True)
+        )
+    }
+    wait(futures.values())
+    return futures
+
+def server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
+
+def fetch_trends(cat_id: int, keyword: str, timeframe: str, geo: str) -> tuple[Dict[str, Any], bool, Dict[str, float]]:
+    """Fetch one keyword's trends from Google.
+
+    Returns the result, whether every widget succeeded, and per-call timings
+    in milliseconds. Raises UpstreamUnavailable when Google is rate limiting
+    us, rather than returning empty data that would render as an empty chart.
+    """
+    complete = True
+    timings = {}
+
+    # Each fetch gets its own session so concurrent payloads never mix
+    with trends_pool.session() as pytrends:
         # Build payload
         try:
-            pytrends.build_payload(
+            _, timings["build_payload"] = timed_call(lambda: pytrends.build_payload(
                 [keyword],
                 cat=cat_id,
                 timeframe=timeframe,
                 geo=geo
-            )
+            ))
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Error building trends payload: {str(e)}"
-            )
-        
-        # Get interest over time
+            ) from e
+
+        widgets = fetch_widgets(pytrends, 'REGION')
+
+    # Get interest over time
+    try:
+        interest_over_time, timings["interest_over_time"] = widgets["interest_over_time"].result()
+        if interest_over_time.empty:
+            print("No interest over time data found")
+            interest_over_time = pd.DataFrame()
+        else:
+            print(f"Interest over time data shape: {interest_over_time.shape}")
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        print(f"Error fetching interest over time: {str(e)}")
+        interest_over_time = pd.DataFrame()
+        complete = False
+
+    # Get interest by region
+    try:
+        interest_by_region, timings["interest_by_region"] = widgets["interest_by_region"].result()
+        if interest_by_region.empty:
+            print("No regional data found")
+            interest_by_region = pd.DataFrame()
+        else:
+            print(f"Regional data shape: {interest_by_region.shape}")
+            print(f"Regional data columns: {interest_by_region.columns}")
+            print(f"First few rows: {interest_by_region.head()}")
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        print(f"Error fetching regional data: {str(e)}")
+        interest_by_region = pd.DataFrame()
+        complete = False
+
+    # Process the data
+    result = {
+        "interest_over_time": serialize_dataframe(interest_over_time),
+        "interest_by_region": serialize_dataframe(interest_by_region)
+    }
+
+    print(f"Final result structure: {result.keys()}")
+    print(f"Regional data in result: {bool(result['interest_by_region'])}")
+
+    return result, complete, timings
+
+def fetch_trends_incremental(cat_id: int, keyword: str, timeframe: str, geo: str,
+                             previous: CacheEntry) -> Optional[tuple[Dict[str, Any], bool, Dict[str, float]]]:
+    """Extend a cached series with a recent window instead of refetching the whole timeframe.
+
+    Only interest over time is fetched; interest by region is kept from the
+    previous fetch. Returns None when the window cannot be placed on the
+    cached series (or fails), in which case the caller does a full fetch.
+    """
+    stored = previous.value["interest_over_time"].get(keyword)
+    if not stored:
+        return None
+    partial = previous.value["interest_over_time"].get("isPartial")
+
+    end = datetime.now()
+    start = end - timedelta(days=TRENDS_INCREMENTAL_WINDOW_DAYS)
+    window = f"{start:%Y-%m-%d} {end:%Y-%m-%d}"
+    timings = {}
+
+    with trends_pool.session() as pytrends:
         try:
-            interest_over_time = pytrends.interest_over_time()
-            if interest_over_time.empty:
-                print("No interest over time data found")
-                interest_over_time = pd.DataFrame()
-            else:
-                print(f"Interest over time data shape: {interest_over_time.shape}")
+            _, timings["build_payload"] = timed_call(lambda: pytrends.build_payload(
+                [keyword],
+                cat=cat_id,
+                timeframe=window,
+                geo=geo
+            ))
+            recent, timings["interest_over_time"] = timed_call(pytrends.interest_over_time)
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
-            print(f"Error fetching interest over time: {str(e)}")
-            interest_over_time = pd.DataFrame()
-        
-        # Get interest by region
+            print(f"Error fetching recent window for {keyword}: {str(e)}")
+            return None
+
+    if recent.empty or keyword not in recent:
+        return None
+    extended = series_extender.extend(
+        stored['dates'], stored['values'], partial['values'] if partial else None, recent, keyword
+    )
+    if extended is None:
+        return None
+
+    result = {
+        "interest_over_time": serialize_dataframe(extended),
+        "interest_by_region": previous.value["interest_by_region"]
+    }
+    return result, True, timings
+
+def coalesced_refresh(key: tuple, priority: str, run: Callable[[], tuple[CacheEntry, Dict[str, float]]],
+                      queued: bool = True) -> tuple[CacheEntry, Dict[str, float]]:
+    """Run a refresh once per key across concurrent callers.
+
+    Only the single-flight leader waits for a trends_queue slot (unless the
+    refresh takes its own slots, queued=False), and once admitted it first
+    checks whether another refresh replaced the entry in the meantime. An
+    interactive caller that joined a background refresh which was then
+    preempted retries as the leader of its own.
+    """
+    seen = trends_cache.peek(key)
+
+    def lead():
+        with trends_queue.slot(priority) if queued else nullcontext():
+            entry = trends_cache.peek(key)
+            if entry is not None and entry is not seen:
+                return entry, {}
+            return run()
+
+    try:
+        return trends_flight.do(key, lead)
+    except UpstreamPreempted:
+        if priority != "interactive":
+            raise
+        return trends_flight.do(key, lead)
+
+def refresh_cached(key: tuple, fetch: Callable[[str], tuple[Dict[str, Any], bool, Dict[str, float]]],
+                   priority: str = "interactive") -> tuple[CacheEntry, Dict[str, float]]:
+    """Run fetch(priority) and cache its result, unless part of the fetch failed.
+
+    The fetch takes its own trends_queue slots. Concurrent refreshes of the
+    same key are coalesced into one upstream fetch, and share the returned
+    entry (and so its encoded responses).
+    """
+    def run():
+        result, complete, timings = fetch(priority)
+        if not complete:
+            return CacheEntry(result), timings
+        return trends_cache.put(key, result), timings
+
+    return coalesced_refresh(key, priority, run, queued=False)
+
+def refresh_trends(cat_id: int, keyword: str, timeframe: str, geo: str,
+                   priority: str = "interactive") -> tuple[CacheEntry, Dict[str, float]]:
+    """Fetch one keyword's trends and store them in memory and on disk, unless part of the fetch failed.
+
+    Long timeframes are extended from a recent window when the cached series
+    had a full fetch within TRENDS_INCREMENTAL_MAX_AGE. Concurrent refreshes of
+    the same key are coalesced into one upstream fetch, which waits for a slot
+    of its priority class in trends_queue.
+    """
+    key = (cat_id, keyword, timeframe, geo)
+
+    def run():
+        fetched, full_fetched_at = None, None
+        previous = trends_cache.peek(key)
+        if (timeframe in TRENDS_INCREMENTAL_TIMEFRAMES and previous is not None
+                and time.time() - previous.full_fetched_at < TRENDS_INCREMENTAL_MAX_AGE):
+            fetched = fetch_trends_incremental(cat_id, keyword, timeframe, geo, previous)
+            if fetched is not None:
+                full_fetched_at = previous.full_fetched_at
+        if fetched is None:
+            fetched = fetch_trends(cat_id, keyword, timeframe, geo)
+
+        result, complete, timings = fetched
+        if not complete:
+            return CacheEntry(result), timings
+        entry = trends_cache.put(key, result, full_fetched_at=full_fetched_at)
+        trends_store.save(key, result, entry.fetched_at, entry.full_fetched_at)
+        return entry, timings
+
+    return coalesced_refresh(key, priority, run)
+
+def serve_cached(key: tuple, timeframe: str, refresh: Callable[[str], tuple[CacheEntry, Dict[str, float]]],
+                 priority: str = "interactive") -> tuple[CacheEntry, str, Dict[str, float]]:
+    """Serve a trends result from the cache, calling refresh(priority) on a miss.
+
+    Returns the cache entry, its cache status (HIT, STALE or MISS) and the
+    upstream timings of a miss. Stale entries are refreshed in the background
+    as prefetch jobs. Raises UpstreamUnavailable only when Google is
+    throttling us (or the job was preempted) and nothing is cached.
+    """
+    ttl = ttl_for(timeframe)
+    entry = trends_cache.get(key, ttl)
+    if entry is None:
+        try:
+            entry, timings = refresh(priority)
+        except UpstreamUnavailable:
+            # Serve whatever we have, however old, while Google is throttling us
+            entry = trends_cache.peek(key)
+            if entry is None:
+                raise
+            return entry, "STALE", {}
+        return entry, "MISS", timings
+
+    if entry.age >= ttl:
+        trends_cache.refresh_in_background(key, lambda: refresh("prefetch"))
+        return entry, "STALE", {}
+    return entry, "HIT", {}
+
+def cached_entry(key: tuple) -> Optional[CacheEntry]:
+    """The cached entry of a trends series, of any age, loading it from disk if needed.
+
+    Series fetched before a restart are then served and refreshed by age
+    exactly like ones fetched by this process.
+    """
+    entry = trends_cache.peek(key)
+    if entry is None:
+        stored = trends_store.load(key)
+        if stored is not None:
+            entry = trends_cache.put(key, stored.value, stored.fetched_at, stored.full_fetched_at)
+    return entry
+
+def cached_trends(cat_id: int, keyword: str, timeframe: str, geo: str,
+                  priority: str = "interactive") -> tuple[CacheEntry, str, Dict[str, float]]:
+    key = (cat_id, keyword, timeframe, geo)
+    cached_entry(key)
+    return serve_cached(
+        key,
+        timeframe,
+        lambda priority: refresh_trends(cat_id, keyword, timeframe, geo, priority),
+        priority
+    )
+
+def trends_response(request: Request, entry: CacheEntry, cache_status: str, format: str,
+                    timings: Optional[Dict[str, float]] = None) -> Response:
+    """Respond with a cached trends result, encoding it once per entry and format."""
+    payload = entry.derived(format, lambda value: EncodedPayload.of(render_trends(value, format)))
+    headers = {"X-Cache": cache_status, "Age": str(int(entry.age))}
+    if timings:
+        headers["Server-Timing"] = server_timing(timings)
+    return payload_response(request, payload, headers)
+
+def validate_trends_params(category: str, timeframe: str) -> int:
+    """Check the category and timeframe, returning the Google Trends category id."""
+    # Validate timeframe
+    if timeframe not in VALID_TIMEFRAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid timeframe. Must be one of: {', '.join(VALID_TIMEFRAMES)}"
+        )
+
+    # Validate category
+    if category not in CPG_CATEGORIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid category. Must be one of: {', '.join(CPG_CATEGORIES.keys())}"
+        )
+
+    return CPG_CATEGORIES[category]["id"]
+
+def fetch_compare_group(cat_id: int, keywords: List[str], timeframe: str, geo: str,
+                        priority: str = "interactive") -> tuple[pd.DataFrame, pd.DataFrame, bool]:
+    """Fetch interest over time and by state for one payload of up to five keywords.
+
+    Each payload holds its own trends_queue slot, since it checks out its own
+    session. The last value is False when a widget failed and came back empty.
+    """
+    with trends_queue.slot(priority):
+        return fetch_compare_payload(cat_id, keywords, timeframe, geo)
+
+def fetch_compare_payload(cat_id: int, keywords: List[str], timeframe: str, geo: str) -> tuple[pd.DataFrame, pd.DataFrame, bool]:
+    complete = True
+    with trends_pool.session() as pytrends:
+        # Build payload
         try:
-            interest_by_region = pytrends.interest_by_region(resolution='REGION', inc_low_vol=True)
-            if interest_by_region.empty:
-                print("No regional data found")
-                interest_by_region = pd.DataFrame()
-            else:
-                print(f"Regional data shape: {interest_by_region.shape}")
-                print(f"Regional data columns: {interest_by_region.columns}")
-                print(f"First few rows: {interest_by_region.head()}")
+            trends_scheduler.call(lambda: pytrends.build_payload(
+                keywords,
+                cat=cat_id,
+                timeframe=timeframe,
+                geo=geo
+            ))
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
-            print(f"Error fetching regional data: {str(e)}")
-            interest_by_region = pd.DataFrame()
-        
-        # Process the data
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error building trends payload: {str(e)}"
+            ) from e
+
+        widgets = fetch_widgets(pytrends, 'STATE')
+
+    # Get interest over time
+    try:
+        interest_over_time, _ = widgets["interest_over_time"].result()
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        interest_over_time = pd.DataFrame()
+        complete = False
+
+    # Get interest by region
+    try:
+        interest_by_region, _ = widgets["interest_by_region"].result()
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        interest_by_region = pd.DataFrame()
+        complete = False
+
+    return interest_over_time, interest_by_region, complete
+
+def fetch_comparison(cat_id: int, keywords: List[str], timeframe: str, geo: str,
+                     priority: str = "interactive", anchor: Optional[str] = None
+                     ) -> tuple[Dict[str, Any], bool, Dict[str, float]]:
+    """Fetch a comparison of keywords, rescaling multi-payload comparisons onto an anchor.
+
+    Without a given anchor the first payload is fetched on its own and its
+    keyword with the most interest anchors the remaining groups.
+    """
+    if len(keywords) <= TRENDS_PAYLOAD_KEYWORDS:
+        interest_over_time, interest_by_region, complete = fetch_compare_group(cat_id, keywords, timeframe, geo, priority)
         result = {
             "interest_over_time": serialize_dataframe(interest_over_time),
             "interest_by_region": serialize_dataframe(interest_by_region)
         }
-        
-        print(f"Final result structure: {result.keys()}")
-        print(f"Regional data in result: {bool(result['interest_by_region'])}")
-        
-        return result
-    
-    except HTTPException as he:
-        raise he
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return result, complete, {}
+
+    # More than one payload: fetch every anchor group at once and rescale onto the first
+    frames = []
+    if anchor is None:
+        first = keywords[:TRENDS_PAYLOAD_KEYWORDS]
+        frames.append(fetch_compare_group(cat_id, first, timeframe, geo, priority))
+        anchor = volume_anchor(frames[0][0]) or first[0]
+        groups = anchor_groups([anchor] + keywords[TRENDS_PAYLOAD_KEYWORDS:])
+    else:
+        groups = anchor_groups([anchor] + [kw for kw in keywords if kw != anchor])
+    futures = [
+        compare_executor.submit(fetch_compare_group, cat_id, group, timeframe, geo, priority)
+        for group in groups
+    ]
+    frames.extend(future.result() for future in futures)
+    interest_over_time = merge_over_time([f[0] for f in frames], anchor)
+    interest_by_region = merge_by_region([f[1] for f in frames], anchor)
+    # Keywords whose group could not be rescaled are reported instead of shown as zeros,
+    # and the result is not cached so the next request tries again
+    unplaced = unplaced_keywords(keywords, interest_over_time, interest_by_region)
+    result = {
+        "interest_over_time": serialize_dataframe(interest_over_time),
+        "interest_by_region": serialize_dataframe(interest_by_region),
+        "anchor": anchor,
+        "unplaced": unplaced
+    }
+    return result, all(f[2] for f in frames) and not unplaced, {}
 
 @app.get("/trends/compare/{category}")
 def compare_trends(
     category: str,
-    keywords: List[str],
+    request: Request,
+    keywords: List[str] = Query([], description="Repeat for each keyword: ?keywords=a&keywords=b"),
+    anchor: Optional[str] = None,
     timeframe: str = "today 12-m",
-    geo: str = "US"
+    geo: str = "US",
+    format: str = "default"
 ):
     try:
-        # Validate timeframe
-        if timeframe not in VALID_TIMEFRAMES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid timeframe. Must be one of: {', '.join(VALID_TIMEFRAMES)}"
-            )
-        
-        # Validate category
-        if category not in CPG_CATEGORIES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid category. Must be one of: {', '.join(CPG_CATEGORIES.keys())}"
-            )
-        
-        # Get category ID
-        cat_id = CPG_CATEGORIES[category]["id"]
+        cat_id = validate_trends_params(category, timeframe)
+        validate_format(format)
         
         # Validate keywords
-        if not keywords or len(keywords) > 5:
+        keywords = canonical_keywords(keywords)
+        if not keywords or len(keywords) > TRENDS_COMPARE_MAX_KEYWORDS:
             raise HTTPException(
                 status_code=400,
-                detail="Must provide between 1 and 5 keywords"
+                detail=f"Must provide between 1 and {TRENDS_COMPARE_MAX_KEYWORDS} keywords"
             )
         
-        # Build payload
+        # The anchor only matters once the keywords span more than one payload;
+        # without one, fetch_comparison picks the highest-volume keyword
+        if len(keywords) > TRENDS_PAYLOAD_KEYWORDS and anchor:
+            anchor = " ".join(anchor.split())
+            if anchor not in keywords:
+                raise HTTPException(status_code=400, detail="anchor must be one of the keywords")
+        else:
+            anchor = None
+        
+        # The same keyword set in any order shares one cache entry
+        key = ("compare", cat_id, tuple(keywords), anchor, timeframe, geo)
         try:
-            pytrends.build_payload(
-                keywords,
-                cat=cat_id,
-                timeframe=timeframe,
-                geo=geo
+            entry, cache_status, _ = serve_cached(
+                key,
+                timeframe,
+                lambda priority: refresh_cached(
+                    key,
+                    lambda priority: fetch_comparison(cat_id, keywords, timeframe, geo, priority, anchor),
+                    priority
+                )
             )
-        except Exception as e:
+        except UpstreamUnavailable as e:
             raise HTTPException(
-                status_code=400,
-                detail=f"Error building trends payload: {str(e)}"
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(max(1, int(e.retry_after)))}
             )
-        
-        # Get interest over time
-        try:
-            interest_over_time = pytrends.interest_over_time()
-        except Exception as e:
-            interest_over_time = pd.DataFrame()
-        
-        # Get interest by region
+
+        return trends_response(request, entry, cache_status, format)
+    
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/trends/{category}/{keyword}")
+def get_trends(
+    category: str,
+    keyword: str,
+    request: Request,
+    timeframe: str = "today 12-m",
+    geo: str = "US",
+    format: str = "default"
+):
+    try:
+        cat_id = validate_trends_params(category, timeframe)
+        validate_format(format)
+        keyword_popularity.record(keyword)
+
+        # Serve cached data, refreshing stale entries in the background
         try:
-            interest_by_region = pytrends.interest_by_region(resolution='STATE', inc_low_vol=True)
-        except Exception as e:
-            interest_by_region = pd.DataFrame()
-        
-        return {
-            "interest_over_time": serialize_dataframe(interest_over_time),
-            "interest_by_region": serialize_dataframe(interest_by_region)
-        }
+            entry, cache_status, timings = cached_trends(cat_id, keyword, timeframe, geo)
+        except UpstreamUnavailable as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(max(1, int(e.retry_after)))}
+            )
+
+        return trends_response(request, entry, cache_status, format, timings)
     
     except HTTPException as he:
         raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class TrendsBatchItem(BaseModel):
+    category: str
+    keyword: str
+
+class TrendsBatchRequest(BaseModel):
+    items: List[TrendsBatchItem]
+    timeframe: str = "today 12-m"
+    geo: str = "US"
+    format: str = "default"
+
+def batch_line(index: int, item: TrendsBatchItem, timeframe: str, geo: str, format: str) -> Dict[str, Any]:
+    """Fetch one batch item, reporting failures in the line instead of raising."""
+    line = {"index": index, "category": item.category, "keyword": item.keyword}
+    try:
+        cat_id = validate_trends_params(item.category, timeframe)
+        keyword_popularity.record(item.keyword)
+        entry, cache_status, _ = cached_trends(cat_id, item.keyword, timeframe, geo, priority="bulk")
+        line.update(status=200, cache=cache_status, age=int(entry.age), data=render_trends(entry.value, format))
+    except UpstreamUnavailable as e:
+        line.update(status=503, error=str(e), retry_after=max(1, int(e.retry_after)))
+    except HTTPException as he:
+        line.update(status=he.status_code, error=he.detail)
+    except Exception as e:
+        line.update(status=500, error=str(e))
+    return line
+
+@app.post("/trends/batch")
+async def get_trends_batch(request: TrendsBatchRequest):
+    """Stream trends for many (category, keyword) pairs as NDJSON, in completion order.
+
+    Each line carries the index of its item in the request. At most
+    TRENDS_BATCH_CONCURRENCY items are fetched at once, so the queue in front of
+    the rate limiter stays short enough that items wait for tokens instead of
+    being shed.
+    """
+    if not request.items or len(request.items) > TRENDS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Must provide between 1 and {TRENDS_BATCH_MAX_ITEMS} items"
+        )
+    validate_format(request.format)
+
+    semaphore = asyncio.Semaphore(TRENDS_BATCH_CONCURRENCY)
+
+    async def fetch(index: int, item: TrendsBatchItem) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_in_threadpool(batch_line, index, item, request.timeframe, request.geo, request.format)
+
+    async def stream():
+        tasks = [asyncio.ensure_future(fetch(index, item)) for index, item in enumerate(request.items)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield dumps(await task) + b"\n"
+        finally:
+            # Stop queued items from reaching Google if the client goes away
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def top_videos_from_snapshot(snapshot: YouTubeSnapshot, keyword: str) -> List[Dict[str, Any]]:
+    # Filter for exact phrase match
+    video_ids = []
+    for result in snapshot.results:
+        if keyword.lower() in result.title.lower() or keyword.lower() in result.description.lower():
+            video_ids.append(result.video_id)
+
+    # Process and sort videos
+    videos = []
+    for video_id in video_ids:
+        video = snapshot.videos.get(video_id)
+        if video is None:
+            continue
+        videos.append({
+            "title": video.title,
+            "views": video.views,
+            "thumbnail": video.thumbnail,
+            "channel": video.channel,
+            "videoId": video.video_id
+        })
+
+    # Sort by views and get top 5
+    return sorted(videos, key=lambda x: x['views'], reverse=True)[:5]
+
+def sentiment_titles_from_snapshot(snapshot: YouTubeSnapshot, keyword: str) -> List[str]:
+    # Process the most-viewed English titles, the same videos the tags analysis uses
+    titles = []
+    for result in snapshot.results:
+        title = result.title
+        if keyword.lower() in title.lower() and title not in titles and snapshot.is_english(title):
+            titles.append(title)
+            if len(titles) >= 25:
+                break
+    return titles
+
+async def sentiment_from_snapshot(snapshot: YouTubeSnapshot, keyword: str) -> Dict[str, Any]:
+    # Language detection is CPU-bound, so keep it off the event loop
+    titles = await run_in_threadpool(sentiment_titles_from_snapshot, snapshot, keyword)
+
+    # Analyze sentiment once the model is available
+    loaded = await wait_until_loaded_async(SENTIMENT_READY_TIMEOUT)
+    if not loaded:
+        status = model_status()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Sentiment model unavailable: {status['error']}" if status['error']
+            else "Sentiment model is still loading, please retry shortly"
+        )
+    sentiment_counts = {"Negative": 0, "Neutral": 0, "Positive": 0}
+    for label, _ in await sentiment_batcher.classify(titles):
+        sentiment_counts[label] += 1
+
+    total = sum(sentiment_counts.values())
+    sentiment_percentages = {
+        k: round((v / total * 100 if total > 0 else 0), 1)
+        for k, v in sentiment_counts.items()
+    }
+
+    return {
+        "sentiment_counts": sentiment_counts,
+        "sentiment_percentages": sentiment_percentages,
+        "total_analyzed": total
+    }
+
+def trending_tags_from_snapshot(snapshot: YouTubeSnapshot, keyword: str) -> List[Dict[str, Any]]:
+    # Get video IDs
+    video_ids = []
+    for result in snapshot.results:
+        if keyword.lower() in result.title.lower() and snapshot.is_english(result.title):
+            video_ids.append(result.video_id)
+        if len(video_ids) >= 25:
+            break
+
+    # Process tags
+    all_tags = []
+    for video_id in video_ids:
+        video = snapshot.videos.get(video_id)
+        if video is not None:
+            all_tags.extend(video.tags)
+
+    # Count and filter tags
+    tag_counts = {}
+    for tag in all_tags:
+        if keyword.lower() not in tag.lower() and len(tag) > 2:
+            tag_counts[tag] = tag_counts.get(tag, 0) + 1
+
+    # Get top 15 tags
+    top_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:15]
+    return [{"tag": tag, "count": count} for tag, count in top_tags]
+
+async def youtube_snapshot(keyword: str, endpoint: str) -> YouTubeSnapshot:
+    """The keyword's search snapshot for a user request, answering 503 once the YouTube quota is used up."""
+    keyword_popularity.record(keyword)
+    try:
+        return await youtube_snapshots.get(keyword, endpoint=endpoint)
+    except UpstreamUnavailable as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, int(e.retry_after)))}
+        )
+
 @app.get("/youtube/top-videos/{keyword}")
-async def get_top_videos(keyword: str):
+async def get_top_videos(keyword: str, request: Request):
     try:
-        # Search for videos
-        search_response = youtube.search().list(
-            q=f'"{keyword}"',
-            part='snippet',
-            type='video',
-            order='viewCount',
-            maxResults=25,
-            safeSearch='strict'
-        ).execute()
-
-        # Filter for exact phrase match
-        filtered_items = []
-        for item in search_response['items']:
-            title = item['snippet']['title'].lower()
-            description = item['snippet'].get('description', '').lower()
-            if keyword.lower() in title or keyword.lower() in description:
-                filtered_items.append(item)
-
-        # Get video statistics
-        video_ids = [item['id']['videoId'] for item in filtered_items]
-        if not video_ids:
-            return {"videos": []}
-
-        video_response = youtube.videos().list(
-            part='snippet,statistics',
-            id=','.join(video_ids)
-        ).execute()
-
-        # Process and sort videos
-        videos = []
-        for item in video_response['items']:
-            videos.append({
-                "title": item['snippet']['title'],
-                "views": int(item['statistics'].get('viewCount', 0)),
-                "thumbnail": item['snippet']['thumbnails']['default']['url'],
-                "channel": item['snippet']['channelTitle'],
-                "videoId": item['id']
-            })
-
-        # Sort by views and get top 5
-        top_videos = sorted(videos, key=lambda x: x['views'], reverse=True)[:5]
-        return {"videos": top_videos}
+        snapshot = await youtube_snapshot(keyword, "top_videos")
+        return payload_response(request, EncodedPayload.of({"videos": top_videos_from_snapshot(snapshot, keyword)}))
 
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/youtube/sentiment/{keyword}")
-async def get_sentiment_analysis(keyword: str):
+async def get_sentiment_analysis(keyword: str, request: Request):
     try:
-        # Fetch videos
-        search_response = youtube.search().list(
-            q=f'"{keyword}"',
-            part='snippet',
-            type='video',
-            order='date',
-            maxResults=50,
-            safeSearch='strict'
-        ).execute()
-
-        # Process English titles
-        titles = []
-        for item in search_response['items']:
-            title = item['snippet']['title']
-            if keyword.lower() in title.lower():
-                try:
-                    if detect(title) == 'en' and title not in titles:
-                        titles.append(title)
-                    if len(titles) >= 25:
-                        break
-                except:
-                    continue
-
-        # Analyze sentiment
-        sentiment_counts = {"Negative": 0, "Neutral": 0, "Positive": 0}
-        for title in titles:
-            label, _ = classify_sentiment(title)
-            sentiment_counts[label] += 1
-
-        total = sum(sentiment_counts.values())
-        sentiment_percentages = {
-            k: round((v / total * 100 if total > 0 else 0), 1)
-            for k, v in sentiment_counts.items()
-        }
-
-        return {
-            "sentiment_counts": sentiment_counts,
-            "sentiment_percentages": sentiment_percentages,
-            "total_analyzed": total
-        }
+        snapshot = await youtube_snapshot(keyword, "sentiment")
+        return payload_response(request, EncodedPayload.of(await sentiment_from_snapshot(snapshot, keyword)))
 
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/youtube/trending-tags/{keyword}")
-async def get_trending_tags(keyword: str):
+async def get_trending_tags(keyword: str, request: Request):
     try:
-        # Fetch videos
-        search_response = youtube.search().list(
-            q=f'"{keyword}"',
-            part='snippet',
-            type='video',
-            maxResults=50,
-            safeSearch='strict'
-        ).execute()
-
-        # Get video IDs
-        video_ids = []
-        for item in search_response['items']:
-            title = item['snippet']['title']
-            try:
-                if detect(title) == 'en' and keyword.lower() in title.lower():
-                    video_ids.append(item['id']['videoId'])
-                if len(video_ids) >= 25:
-                    break
-            except:
-                continue
-
-        if not video_ids:
-            return {"tags": []}
-
-        # Fetch video details to get tags
-        video_response = youtube.videos().list(
-            part='snippet',
-            id=','.join(video_ids)
-        ).execute()
-
-        # Process tags
-        all_tags = []
-        for video in video_response['items']:
-            tags = video['snippet'].get('tags', [])
-            all_tags.extend(tags)
-
-        # Count and filter tags
-        tag_counts = {}
-        for tag in all_tags:
-            if keyword.lower() not in tag.lower() and len(tag) > 2:
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
-
-        # Get top 15 tags
-        top_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:15]
-        return {
-            "tags": [{"tag": tag, "count": count} for tag, count in top_tags]
-        }
+        snapshot = await youtube_snapshot(keyword, "trending_tags")
+        tags = await run_in_threadpool(trending_tags_from_snapshot, snapshot, keyword)
+        return payload_response(request, EncodedPayload.of({"tags": tags}))
 
+    except HTTPException as he:
+        raise he
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/youtube/summary/{keyword}")
+async def get_youtube_summary(keyword: str, request: Request):
+    try:
+        snapshot = await youtube_snapshot(keyword, "summary")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Run the three analyses of the shared snapshot concurrently
+    videos, sentiment, tags = await asyncio.gather(
+        run_in_threadpool(top_videos_from_snapshot, snapshot, keyword),
+        sentiment_from_snapshot(snapshot, keyword),
+        run_in_threadpool(trending_tags_from_snapshot, snapshot, keyword),
+        return_exceptions=True
+    )
+
+    # A failed analysis is reported next to the others instead of failing the whole summary
+    errors = {}
+    for name, value in (("videos", videos), ("sentiment", sentiment), ("tags", tags)):
+        if isinstance(value, HTTPException):
+            errors[name] = value.detail
+        elif isinstance(value, Exception):
+            errors[name] = str(value)
+
+    return payload_response(request, EncodedPayload.of({
+        "videos": videos if "videos" not in errors else [],
+        "sentiment": sentiment if "sentiment" not in errors else None,
+        "tags": tags if "tags" not in errors else [],
+        "errors": errors
+    }))
+
+def catalog_keywords() -> List[tuple[str, int, str]]:
+    """(category, category id, keyword) of every subcategory in the catalog."""
+    return [
+        (category, info["id"], keyword)
+        for category, info in CPG_CATEGORIES.items()
+        for keyword in info["subcategories"]
+    ]
+
+def warm_trends_jobs() -> List[tuple[str, float, str, Callable[[], Any]]]:
+    """Every catalog keyword and timeframe for the US, with seconds until its cached series goes stale.
+
+    Listed timeframe by timeframe, starting with the dashboard's default, so
+    equally popular keywords are warmed for the view users open first.
+    """
+    jobs = []
+    for timeframe in sorted(VALID_TIMEFRAMES, key=lambda timeframe: timeframe != "today 12-m"):
+        for category, cat_id, keyword in catalog_keywords():
+            entry = cached_entry((cat_id, keyword, timeframe, "US"))
+            expires_in = ttl_for(timeframe) - entry.age if entry is not None else 0.0
+            jobs.append((
+                f"{category}/{keyword} {timeframe}",
+                expires_in,
+                keyword,
+                lambda cat_id=cat_id, keyword=keyword, timeframe=timeframe: refresh_trends(cat_id, keyword, timeframe, "US", "prefetch")
+            ))
+    return jobs
+
+async def warm_youtube(keyword: str):
+    # Fetch the snapshot and classify its titles so the summary's slowest parts are cached
+    snapshot = await youtube_snapshots.get(keyword, priority="prefetch", endpoint="warmer", refresh=True)
+    await sentiment_from_snapshot(snapshot, keyword)
+
+def warm_youtube_jobs() -> List[tuple[float, str, Callable[[], Any]]]:
+    return [
+        (youtube_snapshots.expires_in(keyword), keyword, lambda keyword=keyword: warm_youtube(keyword))
+        for _, _, keyword in catalog_keywords()
+    ]
+
+# Keeps the catalog's trends and YouTube results warm ahead of the first click
+cache_warmer = CacheWarmer(warm_trends_jobs, warm_youtube_jobs, keyword_popularity, unavailable=(UpstreamUnavailable,),
+                           youtube_interval=youtube_snapshots.ttl * CACHE_WARM_YOUTUBE_TTL_FRACTION)
@@ -0,0 +1,256 @@
+from typing import List, Dict, Any, Optional
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+
+from sentiment_cache import sentiment_cache, normalize_title, cache_key
+
+# Sentiment model configuration
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment"
+SENTIMENT_LABELS = ["Negative", "Neutral", "Positive"]
+SENTIMENT_MAX_BATCH_SIZE = int(os.getenv('SENTIMENT_MAX_BATCH_SIZE', '16'))
+
+# Inference backend: fp32 PyTorch, int8 dynamically quantized PyTorch or ONNX Runtime
+SENTIMENT_BACKENDS = ["pytorch", "quantized", "onnx"]
+SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'pytorch').lower()
+# Exported ahead of time (the Docker image does this at build time) with `python sentiment.py export`
+SENTIMENT_ONNX_PATH = os.getenv('SENTIMENT_ONNX_PATH', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'models', 'twitter-roberta-base-sentiment.onnx'))
+
+# Load the model in a background thread at startup (otherwise on first use)
+SENTIMENT_PRELOAD = os.getenv('SENTIMENT_PRELOAD', '1') == '1'
+
+class TorchBackend:
+    """Runs the Hugging Face model (optionally int8-quantized) with PyTorch."""
+    tensor_type = "pt"
+
+    def __init__(self, model):
+        self.model = model
+
+    def probabilities(self, inputs) -> List[List[float]]:
+        import torch
+        with torch.inference_mode():
+            return torch.softmax(self.model(**inputs).logits, dim=-1).tolist()
+
+class OnnxBackend:
+    """Runs an exported copy of the model in an ONNX Runtime CPU session."""
+    tensor_type = "np"
+
+    def __init__(self, path: str):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError("SENTIMENT_BACKEND=onnx requires the onnxruntime package")
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_names = [item.name for item in self.session.get_inputs()]
+
+    def probabilities(self, inputs) -> List[List[float]]:
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        logits = self.session.run(None, feed)[0]
+        exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return (exp / exp.sum(axis=-1, keepdims=True)).tolist()
+
+def export_onnx(model, path: str):
+    """Export the sequence classifier to ONNX with dynamic batch and sequence axes."""
+    import torch
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    sample = get_tokenizer()(["export sample"], return_tensors="pt")
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"]),
+        path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"}
+        },
+        opset_version=14
+    )
+
+def load_model():
+    from transformers import AutoModelForSequenceClassification
+    return AutoModelForSequenceClassification.from_pretrained(MODEL_NAME).eval()
+
+def load_backend(name: str, onnx_path: str = SENTIMENT_ONNX_PATH):
+    if name not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Invalid SENTIMENT_BACKEND. Must be one of: {', '.join(SENTIMENT_BACKENDS)}")
+    if name == "onnx":
+        # Exporting needs torch and takes minutes, so it is never done while serving
+        if not os.path.exists(onnx_path):
+            raise RuntimeError(f"ONNX model not found at {onnx_path}; "
+                               f"create it with `python sentiment.py export {onnx_path}`")
+        return OnnxBackend(onnx_path)
+
+    # torch is imported here so importing this module (and the onnx backend) stays cheap
+    import torch
+    model = load_model()
+    if name == "quantized":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return TorchBackend(model)
+
+# Results from different backends may differ slightly, so they are cached apart
+CACHE_MODEL_ID = f"{MODEL_NAME}:{SENTIMENT_BACKEND}"
+
+# Sentiment model state, filled in by the loader thread
+tokenizer = None
+backend = None
+_state_lock = threading.Lock()
+_loaded = threading.Event()
+_loader: Optional[threading.Thread] = None
+_load_error: Optional[str] = None
+_load_seconds: Optional[float] = None
+# (loop, asyncio.Event) pairs of coroutines waiting for the loader
+_async_waiters: list = []
+
+def get_tokenizer():
+    global tokenizer
+    with _state_lock:
+        if tokenizer is None:
+            if SENTIMENT_BACKEND == "onnx":
+                # The onnx backend never needs torch; keep transformers from importing it
+                os.environ.setdefault('USE_TORCH', '0')
+            from transformers import AutoTokenizer
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    return tokenizer
+
+def _load_model():
+    global backend, _load_error, _load_seconds
+    started = time.perf_counter()
+    try:
+        get_tokenizer()
+        backend = load_backend(SENTIMENT_BACKEND)
+        _load_seconds = time.perf_counter() - started
+        print(f"Sentiment model ({SENTIMENT_BACKEND}) loaded in {_load_seconds:.1f}s")
+    except Exception as e:
+        _load_error = str(e)
+        print(f"Error loading sentiment model: {_load_error}")
+    finally:
+        with _state_lock:
+            _loaded.set()
+            waiters = list(_async_waiters)
+            _async_waiters.clear()
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # that event loop has been closed
+
+def start_loading():
+    """Start loading the sentiment model in a background thread (once)."""
+    global _loader
+    with _state_lock:
+        if _loader is None:
+            _loader = threading.Thread(target=_load_model, name="sentiment-loader", daemon=True)
+            _loader.start()
+
+def wait_until_loaded(timeout: Optional[float] = None) -> bool:
+    """Block until the model is ready; False on timeout or if loading failed."""
+    start_loading()
+    return _loaded.wait(timeout) and backend is not None
+
+async def wait_until_loaded_async(timeout: Optional[float] = None) -> bool:
+    """Like wait_until_loaded, but awaits the loader without holding an executor thread."""
+    start_loading()
+    event = asyncio.Event()
+    with _state_lock:
+        if not _loaded.is_set():
+            _async_waiters.append((asyncio.get_running_loop(), event))
+        else:
+            event.set()
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        return False
+    return backend is not None
+
+def model_status() -> Dict[str, Any]:
+    return {
+        "ready": backend is not None,
+        "loading": _loader is not None and not _loaded.is_set(),
+        "backend": SENTIMENT_BACKEND,
+        "load_seconds": round(_load_seconds, 2) if _load_seconds is not None else None,
+        "error": _load_error
+    }
+
+def predict_probabilities(texts: List[str], batch_size: int, runner=None) -> List[List[float]]:
+    """Run a backend over texts sorted by token length so each batch pads minimally."""
+    if runner is None:
+        if not wait_until_loaded():
+            raise RuntimeError(f"Sentiment model failed to load: {_load_error}")
+        runner = backend
+    tokenizer = get_tokenizer()
+    lengths = [len(ids) for ids in tokenizer(list(texts), truncation=True)['input_ids']]
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+    results: List[Optional[List[float]]] = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        inputs = tokenizer(
+            [texts[i] for i in indices],
+            padding=True,
+            truncation=True,
+            return_tensors=runner.tensor_type
+        )
+        for i, row in zip(indices, runner.probabilities(inputs)):
+            results[i] = row
+    return results
+
+def _to_result(entry: tuple[str, List[float]]) -> tuple[str, float]:
+    label, probs = entry
+    return label, float(max(probs))
+
+def lookup_sentiments(texts: List[str]) -> List[Optional[tuple[str, float]]]:
+    """Cached (label, score) per text, or None where the title has not been seen."""
+    keys = [cache_key(CACHE_MODEL_ID, normalize_title(text)) for text in texts]
+    cached = sentiment_cache.get_many(keys)
+    return [_to_result(cached[key]) if key in cached else None for key in keys]
+
+def infer_sentiments(
+    texts: List[str],
+    max_batch_size: Optional[int] = None
+) -> List[tuple[str, float]]:
+    """Run the model on texts (bypassing the cache lookup) and store the results."""
+    if not texts:
+        return []
+    batch_size = max(1, max_batch_size or SENTIMENT_MAX_BATCH_SIZE)
+
+    # Titles are classified in their normalized form so cached results are exact
+    normalized = list(dict.fromkeys(normalize_title(text) for text in texts))
+    entries = {}
+    for text, probs in zip(normalized, predict_probabilities(normalized, batch_size)):
+        label = SENTIMENT_LABELS[max(range(len(probs)), key=probs.__getitem__)]
+        entries[cache_key(CACHE_MODEL_ID, text)] = (label, probs)
+    sentiment_cache.put_many(entries)
+    return [_to_result(entries[cache_key(CACHE_MODEL_ID, normalize_title(text))]) for text in texts]
+
+def classify_sentiment_batch(
+    texts: List[str],
+    max_batch_size: Optional[int] = None
+) -> List[tuple[str, float]]:
+    """Classify many texts at once, returning (label, score) in input order.
+
+    Previously seen titles are answered from the sentiment cache; the rest go
+    through the model in length-sorted batches of at most max_batch_size.
+    """
+    results = lookup_sentiments(texts)
+    missing = [text for text, result in zip(texts, results) if result is None]
+    inferred = iter(infer_sentiments(missing, max_batch_size))
+    return [result if result is not None else next(inferred) for result in results]
+
+def classify_sentiment(text: str) -> tuple[str, float]:
+    return classify_sentiment_batch([text])[0]
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] != ["export"]:
+        sys.exit("usage: python sentiment.py export [onnx_path]")
+    path = sys.argv[2] if len(sys.argv) > 2 else SENTIMENT_ONNX_PATH
+    print(f"Exporting {MODEL_NAME} to {path}")
+    export_onnx(load_model(), path)
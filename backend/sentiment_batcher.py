@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+import asyncio
+import os
+import time
+
+from sentiment import lookup_sentiments, infer_sentiments
+from sentiment_cache import sentiment_cache
+
+# Micro-batching configuration
+SENTIMENT_BATCH_WINDOW_MS = float(os.getenv('SENTIMENT_BATCH_WINDOW_MS', '10'))
+SENTIMENT_BATCH_MAX_TITLES = int(os.getenv('SENTIMENT_BATCH_MAX_TITLES', '64'))
+
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+class SentimentBatcher:
+    """Collects titles from concurrent requests and classifies them together.
+
+    Callers await `classify`; titles already in the sentiment cache are
+    answered immediately (looked up in a thread when the cache is backed by
+    SQLite), the rest are queued. A single worker task waits up
+    to the batching window for more work, runs one forward pass for
+    everything it collected and hands each caller back its own results.
+    """
+
+    def __init__(self, window_ms: float = SENTIMENT_BATCH_WINDOW_MS,
+                 max_titles: int = SENTIMENT_BATCH_MAX_TITLES):
+        self.window = window_ms / 1000
+        self.max_titles = max(1, max_titles)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # One inference thread so concurrent batches never fight over the CPU
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment")
+        # On-disk cache lookups (SELECT plus the used_at commit) run here, off the event loop
+        self._lookup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment-cache")
+        self._batches = 0
+        self._titles = 0
+        self._histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._histogram_overflow = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._waits = 0
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def classify(self, texts: List[str]) -> List[tuple[str, float]]:
+        if sentiment_cache.persistent:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._lookup_executor, lookup_sentiments, texts
+            )
+        else:
+            results = lookup_sentiments(texts)
+        missing = [text for text, result in zip(texts, results) if result is None]
+        if not missing:
+            return results
+
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((missing, future, time.perf_counter()))
+        inferred = iter(await future)
+        return [result if result is not None else next(inferred) for result in results]
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        pending = [await self._queue.get()]
+        count = len(pending[0][0])
+        deadline = loop.time() + self.window
+        while count < self.max_titles:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            pending.append(item)
+            count += len(item[0])
+        return pending
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = await self._collect()
+            started = time.perf_counter()
+            for _, _, enqueued in pending:
+                self._record_wait(started - enqueued)
+
+            # Identical titles from different requests are only classified once
+            unique = list(dict.fromkeys(text for texts, _, _ in pending for text in texts))
+            self._record_batch(len(unique))
+            try:
+                labels = await loop.run_in_executor(self._executor, infer_sentiments, unique)
+            except Exception as e:
+                for _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            by_text = dict(zip(unique, labels))
+            for texts, future, _ in pending:
+                if not future.done():
+                    future.set_result([by_text[text] for text in texts])
+
+    def _record_wait(self, wait: float):
+        self._waits += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+
+    def _record_batch(self, size: int):
+        self._batches += 1
+        self._titles += size
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self._histogram[bucket] += 1
+                break
+        else:
+            self._histogram_overflow += 1
+
+    def stats(self) -> Dict[str, Any]:
+        histogram = {f"<={bucket}": count for bucket, count in self._histogram.items()}
+        histogram[f">{BATCH_SIZE_BUCKETS[-1]}"] = self._histogram_overflow
+        return {
+            "window_ms": self.window * 1000,
+            "max_titles": self.max_titles,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batches": self._batches,
+            "titles": self._titles,
+            "batch_size_histogram": histogram,
+            "wait_ms": {
+                "mean": round(self._wait_total / self._waits * 1000, 3) if self._waits else 0.0,
+                "max": round(self._wait_max * 1000, 3)
+            }
+        }
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+        self._lookup_executor.shutdown(wait=False)
+
+sentiment_batcher = SentimentBatcher()
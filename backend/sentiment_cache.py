@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterable
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# Sentiment cache configuration
+SENTIMENT_CACHE_SIZE = int(os.getenv('SENTIMENT_CACHE_SIZE', '10000'))
+SENTIMENT_CACHE_DB = os.getenv('SENTIMENT_CACHE_DB')
+SENTIMENT_CACHE_DB_SIZE = int(os.getenv('SENTIMENT_CACHE_DB_SIZE', '200000'))
+
+def normalize_title(text: str) -> str:
+    """Canonical form of a title: NFKC-normalized with collapsed whitespace."""
+    return ' '.join(unicodedata.normalize('NFKC', text).split())
+
+def cache_key(model_name: str, normalized: str) -> str:
+    return hashlib.sha256(f"{model_name}\n{normalized}".encode('utf-8')).hexdigest()
+
+class SentimentCache:
+    """Bounded LRU of (label, probs) per title, optionally backed by SQLite.
+
+    The in-memory layer is always consulted first; on a miss the SQLite file
+    (if configured) is checked and hits are promoted back into memory.
+    """
+
+    def __init__(self, max_size: int = SENTIMENT_CACHE_SIZE, db_path: Optional[str] = SENTIMENT_CACHE_DB,
+                 db_max_size: int = SENTIMENT_CACHE_DB_SIZE):
+        self.max_size = max(0, max_size)
+        self.db_max_size = max(1, db_max_size)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._db = None
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+                    "key TEXT PRIMARY KEY, label TEXT NOT NULL, probs TEXT NOT NULL, used_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS sentiment_cache_used_at ON sentiment_cache (used_at)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: Failed to open sentiment cache database: {str(e)}")
+                self._db = None
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, tuple[str, List[float]]]:
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    found[key] = entry
+                else:
+                    missing.append(key)
+
+            if missing and self._db is not None:
+                from_disk = self._load(missing)
+                self._disk_hits += len(from_disk)
+                for key, entry in from_disk.items():
+                    self._remember(key, entry)
+                found.update(from_disk)
+                missing = [key for key in missing if key not in from_disk]
+            self._misses += len(missing)
+        return found
+
+    def put_many(self, entries: Dict[str, tuple[str, List[float]]]):
+        if not entries:
+            return
+        with self._lock:
+            for key, entry in entries.items():
+                self._remember(key, entry)
+            if self._db is not None:
+                self._store(entries)
+
+    def _remember(self, key: str, entry: tuple[str, List[float]]):
+        if self.max_size == 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _load(self, keys: List[str]) -> Dict[str, tuple[str, List[float]]]:
+        found = {}
+        try:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT key, label, probs FROM sentiment_cache WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, label, probs in rows:
+                    found[key] = (label, json.loads(probs))
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE sentiment_cache SET used_at = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Error reading sentiment cache database: {str(e)}")
+        return found
+
+    def _store(self, entries: Dict[str, tuple[str, List[float]]]):
+        now = time.time()
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sentiment_cache (key, label, probs, used_at) VALUES (?, ?, ?, ?)",
+                [(key, label, json.dumps(probs), now) for key, (label, probs) in entries.items()]
+            )
+            excess = self._db.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0] - self.db_max_size
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM sentiment_cache WHERE key IN "
+                    "(SELECT key FROM sentiment_cache ORDER BY used_at LIMIT ?)",
+                    (excess,)
+                )
+                self._evictions += excess
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Error writing sentiment cache database: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "disk": self._db is not None,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round((self._hits + self._disk_hits) / lookups, 3) if lookups else 0.0
+            }
+
+sentiment_cache = SentimentCache()
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Hashable, Optional
+import os
+import threading
+import time
+
+# How long a result is served as fresh, per timeframe. Google Trends data for
+# these windows changes at most daily, and longer windows change more slowly.
+TRENDS_CACHE_TTLS = {
+    "today 1-m": 3600,
+    "today 3-m": 3 * 3600,
+    "today 12-m": 12 * 3600,
+    "today 5-y": 24 * 3600
+}
+TRENDS_CACHE_DEFAULT_TTL = 3600
+
+# Stale results are still served (while refreshing) up to this age
+TRENDS_CACHE_MAX_STALE = float(os.getenv('TRENDS_CACHE_MAX_STALE', str(7 * 24 * 3600)))
+TRENDS_CACHE_MAX_ENTRIES = int(os.getenv('TRENDS_CACHE_MAX_ENTRIES', '2000'))
+TRENDS_CACHE_REFRESH_WORKERS = int(os.getenv('TRENDS_CACHE_REFRESH_WORKERS', '2'))
+
+def ttl_for(timeframe: str) -> float:
+    return TRENDS_CACHE_TTLS.get(timeframe, TRENDS_CACHE_DEFAULT_TTL)
+
+class CacheEntry:
+    def __init__(self, value: Any, fetched_at: Optional[float] = None, full_fetched_at: Optional[float] = None):
+        self.value = value
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        # When the data was last fetched in full rather than extended incrementally
+        self.full_fetched_at = full_fetched_at if full_fetched_at is not None else self.fetched_at
+        self._derived: Dict[Hashable, Any] = {}
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def derived(self, name: Hashable, build: Callable[[Any], Any]) -> Any:
+        """build(value), computed once per entry (e.g. the encoded response body)."""
+        if name not in self._derived:
+            self._derived[name] = build(self.value)
+        return self._derived[name]
+
+class TrendsCache:
+    """Bounded in-memory cache of trends responses with stale-while-revalidate.
+
+    Entries older than their TTL are still returned by `get` (up to
+    max_stale) so callers can answer immediately and schedule a refresh with
+    `refresh_in_background`, which runs at most once per key at a time.
+    """
+
+    def __init__(self, max_entries: int = TRENDS_CACHE_MAX_ENTRIES, max_stale: float = TRENDS_CACHE_MAX_STALE,
+                 refresh_workers: int = TRENDS_CACHE_REFRESH_WORKERS):
+        self.max_entries = max(1, max_entries)
+        self.max_stale = max_stale
+        self._entries: OrderedDict = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, refresh_workers), thread_name_prefix="trends-refresh")
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+
+    def get(self, key: Hashable, ttl: float) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.age > self.max_stale:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.age < ttl:
+                self._hits += 1
+            else:
+                self._stale_hits += 1
+            return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Entry of any age (even past max_stale), without touching the counters."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: Hashable, value: Any, fetched_at: Optional[float] = None,
+            full_fetched_at: Optional[float] = None) -> CacheEntry:
+        entry = CacheEntry(value, fetched_at, full_fetched_at)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def refresh_in_background(self, key: Hashable, refresh: Callable[[], None]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                refresh()
+                self._refreshes += 1
+            except Exception as e:
+                self._refresh_errors += 1
+                print(f"Error refreshing cached trends for {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "refreshing": len(self._refreshing),
+                "refreshes": self._refreshes,
+                "refresh_errors": self._refresh_errors
+            }
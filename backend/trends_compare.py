@@ -0,0 +1,115 @@
+from typing import List, Optional
+import os
+
+import numpy as np
+import pandas as pd
+
+# Google Trends accepts at most five keywords per payload
+TRENDS_PAYLOAD_KEYWORDS = 5
+# Most keywords a single comparison may ask for (each extra group of four costs one payload)
+TRENDS_COMPARE_MAX_KEYWORDS = int(os.getenv('TRENDS_COMPARE_MAX_KEYWORDS', '50'))
+
+def canonical_keywords(keywords: List[str]) -> List[str]:
+    """Sorted, de-duplicated keywords with whitespace collapsed, so any ordering compares the same."""
+    return sorted({" ".join(keyword.split()) for keyword in keywords} - {""})
+
+def anchor_groups(keywords: List[str], size: int = TRENDS_PAYLOAD_KEYWORDS) -> List[List[str]]:
+    """Split keywords into payloads that all start with the first keyword (the anchor).
+
+    Every payload is scaled by Google on its own, so the anchor is repeated in
+    each one to give the groups a common reference.
+    """
+    if len(keywords) <= size:
+        return [list(keywords)]
+    anchor, rest = keywords[0], keywords[1:]
+    step = size - 1
+    return [[anchor] + rest[i:i + step] for i in range(0, len(rest), step)]
+
+def volume_anchor(frame: pd.DataFrame) -> Optional[str]:
+    """The keyword with the most interest over time in a payload, or None without data.
+
+    A high-volume anchor keeps enough resolution in every group; a small one
+    is rounded to 0-1 by Google next to larger keywords.
+    """
+    totals = frame.drop(columns=['isPartial'], errors='ignore').sum(numeric_only=True)
+    return str(totals.idxmax()) if not totals.empty else None
+
+def merge_over_time(frames: List[pd.DataFrame], anchor: str) -> pd.DataFrame:
+    """Put the interest over time of every anchor group on one 0-100 scale.
+
+    Each group is multiplied by how much interest the anchor had in the first
+    group relative to that group, then the whole set is scaled so the largest
+    value is 100. Groups whose anchor has no interest (Google rounds a small
+    anchor to 0 next to much larger keywords) cannot be placed and are left out.
+    """
+    frames = [frame for frame in frames if not frame.empty and anchor in frame]
+    if not frames:
+        return pd.DataFrame()
+
+    index = frames[0].index
+    columns, blocks, scales = [], [], []
+    reference = np.nansum(frames[0][anchor].to_numpy(dtype=float))
+    for i, frame in enumerate(frames):
+        frame = frame.reindex(index).drop(columns=['isPartial'], errors='ignore')
+        anchor_total = np.nansum(frame[anchor].to_numpy(dtype=float))
+        if i > 0 and not (anchor_total > 0 and reference > 0):
+            continue
+        keep = [c for c in frame.columns if i == 0 or c != anchor]
+        columns.extend(keep)
+        blocks.append(frame[keep].to_numpy(dtype=float))
+        scales.append(reference / anchor_total if i > 0 else 1.0)
+
+    # One scale factor per group, broadcast over that group's columns
+    values = np.hstack(blocks) * np.repeat(scales, [block.shape[1] for block in blocks])
+
+    peak = np.nanmax(values) if np.isfinite(values).any() else 0
+    if peak > 0:
+        values = values * (100 / peak)
+    values = np.rint(np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)).astype(int)
+
+    merged = pd.DataFrame(values, index=index, columns=columns)
+    if 'isPartial' in frames[0]:
+        merged['isPartial'] = frames[0]['isPartial']
+    return merged
+
+def merge_by_region(frames: List[pd.DataFrame], anchor: str) -> pd.DataFrame:
+    """Combine per-region interest shares of every anchor group.
+
+    Within a payload Google splits each region's interest between its
+    keywords, so a keyword's share divided by the anchor's share is comparable
+    across groups. Those ratios are renormalized to shares of 100 per region;
+    regions where the anchor has no interest come out as zeros, and groups
+    whose anchor has no interest in any region are left out.
+    """
+    frames = [frame for frame in frames if not frame.empty and anchor in frame]
+    if not frames:
+        return pd.DataFrame()
+
+    index = frames[0].index
+    for frame in frames[1:]:
+        index = index.union(frame.index, sort=False)
+
+    columns, blocks = [anchor], []
+    for i, frame in enumerate(frames):
+        frame = frame.reindex(index)
+        anchor_share = frame[anchor].to_numpy(dtype=float)
+        if i > 0 and not np.nansum(anchor_share) > 0:
+            continue
+        others = [c for c in frame.columns if c != anchor]
+        columns.extend(others)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = frame[others].to_numpy(dtype=float) / anchor_share[:, None]
+        blocks.append(np.where(anchor_share[:, None] > 0, ratios, np.nan))
+
+    first_anchor = frames[0].reindex(index)[anchor].to_numpy(dtype=float)
+    anchor_ratio = np.where(first_anchor > 0, 1.0, np.nan)[:, None]
+    ratios = np.hstack([anchor_ratio] + blocks)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = ratios / np.nansum(ratios, axis=1, keepdims=True) * 100
+    shares = np.rint(np.nan_to_num(shares, nan=0.0, posinf=0.0, neginf=0.0)).astype(int)
+    return pd.DataFrame(shares, index=index, columns=columns)
+
+def unplaced_keywords(keywords: List[str], *merged: pd.DataFrame) -> List[str]:
+    """Keywords missing from any non-empty merged frame, which could not be put on the anchor's scale."""
+    return [keyword for keyword in keywords if any(not frame.empty and keyword not in frame for frame in merged)]
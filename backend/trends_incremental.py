@@ -0,0 +1,110 @@
+from typing import Dict, Any, List, Optional
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Timeframes refreshed by fetching only a recent window and appending it to the stored series
+TRENDS_INCREMENTAL_TIMEFRAMES = [
+    timeframe.strip()
+    for timeframe in os.getenv('TRENDS_INCREMENTAL_TIMEFRAMES', 'today 5-y').split(',')
+    if timeframe.strip()
+]
+# Length of the recent window; Google answers windows of about nine months or more weekly,
+# like the long timeframes, so the points line up with the stored ones
+TRENDS_INCREMENTAL_WINDOW_DAYS = int(os.getenv('TRENDS_INCREMENTAL_WINDOW_DAYS', '270'))
+# Weeks the window must share with the stored series, and how far they may disagree
+# (mean absolute difference over mean stored value) after rescaling
+TRENDS_INCREMENTAL_MIN_OVERLAP = int(os.getenv('TRENDS_INCREMENTAL_MIN_OVERLAP', '8'))
+TRENDS_INCREMENTAL_TOLERANCE = float(os.getenv('TRENDS_INCREMENTAL_TOLERANCE', '0.15'))
+# A full fetch is done at least this often, which also refreshes interest by region
+TRENDS_INCREMENTAL_MAX_AGE = float(os.getenv('TRENDS_INCREMENTAL_MAX_AGE', str(7 * 24 * 3600)))
+
+def weekly(series: pd.Series) -> pd.Series:
+    """Series by Sunday-starting week, as Google reports long timeframes.
+
+    Weekly input is returned as is; daily input is summed per week, keeping
+    only complete weeks.
+    """
+    series = series.dropna()
+    if len(series) < 2 or (series.index[1] - series.index[0]) >= pd.Timedelta(days=7):
+        return series
+    week_start = series.index - pd.to_timedelta((series.index.dayofweek + 1) % 7, unit='D')
+    grouped = series.groupby(week_start)
+    sums, counts = grouped.sum(), grouped.count()
+    return sums[counts == 7].astype(float)
+
+class SeriesExtender:
+    """Appends a freshly fetched recent window to a stored series.
+
+    Google scales every fetch so its own peak is 100, so the window is first
+    rescaled onto the stored series using the weeks both contain (ratio of
+    their totals). If the rescaled overlap still disagrees by more than the
+    tolerance, Google has revised the history and the caller should refetch
+    the whole timeframe instead.
+    """
+
+    def __init__(self, min_overlap: int = TRENDS_INCREMENTAL_MIN_OVERLAP,
+                 tolerance: float = TRENDS_INCREMENTAL_TOLERANCE):
+        self.min_overlap = max(1, min_overlap)
+        self.tolerance = tolerance
+        self._lock = threading.Lock()
+        self._counters = {"extended": 0, "short_overlap": 0, "diverged": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def extend(self, dates: List[str], values: List[float], partial: Optional[List[bool]],
+               recent: pd.DataFrame, keyword: str) -> Optional[pd.DataFrame]:
+        """Stored series (dates, values, isPartial flags) extended with `recent`.
+
+        Returns a frame shaped like interest_over_time (the keyword column and
+        isPartial, same number of weeks as stored, peak 100), or None when the
+        window cannot be placed on the stored scale.
+        """
+        stored = pd.Series(np.asarray(values, dtype=float), index=pd.to_datetime(dates))
+        # The last stored week may have been partial; it is replaced, never compared
+        if partial is not None and len(partial) and partial[-1]:
+            stored = stored.iloc[:-1]
+
+        fresh = weekly(recent[keyword])
+        recent_partial = recent['isPartial'].reindex(fresh.index) if 'isPartial' in recent else None
+        complete = fresh[~recent_partial.fillna(False).astype(bool)] if recent_partial is not None else fresh
+
+        overlap = stored.index.intersection(complete.index)
+        if len(overlap) < self.min_overlap:
+            self._count("short_overlap")
+            return None
+
+        stored_overlap = stored.loc[overlap].to_numpy()
+        fresh_overlap = complete.loc[overlap].to_numpy()
+        if fresh_overlap.sum() <= 0 or stored_overlap.sum() <= 0:
+            self._count("short_overlap")
+            return None
+        scale = stored_overlap.sum() / fresh_overlap.sum()
+        divergence = np.abs(fresh_overlap * scale - stored_overlap).mean() / stored_overlap.mean()
+        if divergence > self.tolerance:
+            self._count("diverged")
+            return None
+
+        # Keep the stored history, append the rescaled weeks after it and drop the
+        # oldest weeks so the series covers the same span as before
+        appended = fresh[fresh.index > stored.index[-1]] * scale
+        merged = pd.concat([stored, appended]).iloc[-len(values):]
+        peak = merged.max()
+        merged_values = np.rint(merged.to_numpy() * (100 / peak if peak > 0 else 1)).astype(int)
+
+        is_partial = np.zeros(len(merged), dtype=bool)
+        if recent_partial is not None and len(appended):
+            is_partial[-len(appended):] = recent_partial.reindex(appended.index).fillna(False).to_numpy(dtype=bool)
+
+        self._count("extended")
+        frame = pd.DataFrame({keyword: merged_values}, index=pd.DatetimeIndex(merged.index, name='date'))
+        frame['isPartial'] = is_partial
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._counters)
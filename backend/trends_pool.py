@@ -0,0 +1,126 @@
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Optional
+import os
+import queue
+import threading
+import time
+
+from pytrends.request import TrendReq
+from requests.exceptions import RequestException
+
+from upstream import UpstreamScheduler, is_rate_limited
+
+# Google Trends session pool configuration
+TRENDS_POOL_SIZE = int(os.getenv('TRENDS_POOL_SIZE', '4'))
+TRENDS_POOL_TIMEOUT = float(os.getenv('TRENDS_POOL_TIMEOUT', '30'))
+
+class TrendsPoolTimeout(Exception):
+    pass
+
+def new_trendreq() -> TrendReq:
+    return TrendReq(hl='en-US', tz=360)
+
+def spoils_session(error: Exception) -> bool:
+    """Whether an error (or what caused it) was a 429 or a transport failure, after which the session's cookies are not reused."""
+    while error is not None:
+        if is_rate_limited(error) or isinstance(error, RequestException):
+            return True
+        error = error.__cause__
+    return False
+
+class TrendReqPool:
+    """Fixed-size pool of independent TrendReq sessions.
+
+    TrendReq keeps the current payload (and its own cookies) on the object, so
+    each request checks out a session for its whole build_payload +
+    interest_* sequence and no two requests ever share one. Sessions are
+    created on first demand, since constructing one fetches Google cookies;
+    with a scheduler that cookie request is rate limited like every other
+    Google Trends call. A session is only replaced after a 429 or transport
+    error, not when a call was shed or failed for another reason.
+    """
+
+    def __init__(self, size: int = TRENDS_POOL_SIZE, factory: Callable[[], TrendReq] = new_trendreq,
+                 timeout: float = TRENDS_POOL_TIMEOUT, scheduler: Optional[UpstreamScheduler] = None):
+        self.size = max(1, size)
+        self.factory = factory
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._discarded = 0
+
+    def checkout(self) -> TrendReq:
+        with self._lock:
+            self._checkouts += 1
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self.scheduler.call(self.factory) if self.scheduler is not None else self.factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    self._timeouts += 1
+                raise TrendsPoolTimeout(f"No Google Trends session available after {self.timeout:.0f}s")
+            if not waited:
+                waited = True
+                with self._lock:
+                    self._waits += 1
+            # Wake up periodically in case a discarded session freed a slot
+            try:
+                return self._idle.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+
+    def checkin(self, session: TrendReq, discard: bool = False):
+        if discard:
+            # Free the slot so the next checkout builds a session with fresh cookies
+            with self._lock:
+                self._created -= 1
+                self._discarded += 1
+            return
+        self._idle.put(session)
+
+    @contextmanager
+    def session(self):
+        session = self.checkout()
+        try:
+            yield session
+        except Exception as e:
+            self.checkin(session, discard=spoils_session(e))
+            raise
+        self.checkin(session)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": idle,
+                "in_use": self._created - idle,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded
+            }
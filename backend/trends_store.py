@@ -0,0 +1,127 @@
+from typing import Dict, Any, Optional
+import os
+import sqlite3
+import threading
+import time
+
+import orjson
+
+from json_response import dumps
+
+# On-disk store of fetched trends series; set TRENDS_STORE_DB to an empty value to disable
+TRENDS_STORE_DB = os.getenv('TRENDS_STORE_DB', 'trends_store.sqlite')
+# Series older than this are dropped when the store is opened
+TRENDS_STORE_MAX_AGE = float(os.getenv('TRENDS_STORE_MAX_AGE', str(30 * 24 * 3600)))
+TRENDS_STORE_MAX_ROWS = int(os.getenv('TRENDS_STORE_MAX_ROWS', '50000'))
+
+class StoredSeries:
+    def __init__(self, value: Dict[str, Any], fetched_at: float, full_fetched_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.full_fetched_at = full_fetched_at
+
+class TrendsStore:
+    """SQLite file holding the latest fetch of every (category, keyword, timeframe, geo) series.
+
+    Every complete fetch is written with its fetch time, so after a restart
+    requests are answered from disk (and only refreshed once stale) instead of
+    all going to Google Trends at once.
+    """
+
+    def __init__(self, db_path: Optional[str] = TRENDS_STORE_DB, max_age: float = TRENDS_STORE_MAX_AGE,
+                 max_rows: int = TRENDS_STORE_MAX_ROWS):
+        self.max_age = max_age
+        self.max_rows = max(1, max_rows)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._errors = 0
+        self._db = None
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS trends_series ("
+                    "category_id INTEGER NOT NULL, keyword TEXT NOT NULL, timeframe TEXT NOT NULL, "
+                    "geo TEXT NOT NULL, fetched_at REAL NOT NULL, interest_over_time BLOB NOT NULL, "
+                    "interest_by_region BLOB NOT NULL, full_fetched_at REAL, "
+                    "PRIMARY KEY (category_id, keyword, timeframe, geo))"
+                )
+                # Stores created before incremental refresh lack full_fetched_at
+                columns = [row[1] for row in self._db.execute("PRAGMA table_info(trends_series)")]
+                if "full_fetched_at" not in columns:
+                    self._db.execute("ALTER TABLE trends_series ADD COLUMN full_fetched_at REAL")
+                self._db.execute("CREATE INDEX IF NOT EXISTS trends_series_fetched_at ON trends_series (fetched_at)")
+                self._db.execute("DELETE FROM trends_series WHERE fetched_at < ?", (time.time() - self.max_age,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: Failed to open trends store database: {str(e)}")
+                self._db = None
+
+    def load(self, key: tuple) -> Optional[StoredSeries]:
+        """Latest stored fetch of a (category id, keyword, timeframe, geo) series, of any age."""
+        if self._db is None:
+            return None
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT fetched_at, interest_over_time, interest_by_region, full_fetched_at FROM trends_series "
+                    "WHERE category_id = ? AND keyword = ? AND timeframe = ? AND geo = ?",
+                    key
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._errors += 1
+                print(f"Error reading trends store database: {str(e)}")
+                return None
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        fetched_at, interest_over_time, interest_by_region, full_fetched_at = row
+        return StoredSeries({
+            "interest_over_time": orjson.loads(interest_over_time),
+            "interest_by_region": orjson.loads(interest_by_region)
+        }, fetched_at, full_fetched_at if full_fetched_at is not None else fetched_at)
+
+    def save(self, key: tuple, value: Dict[str, Any], fetched_at: float, full_fetched_at: Optional[float] = None):
+        if self._db is None:
+            return
+        # Encode outside the lock; the series may hold NumPy arrays
+        row = (*key, fetched_at, dumps(value["interest_over_time"]), dumps(value["interest_by_region"]),
+               full_fetched_at if full_fetched_at is not None else fetched_at)
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO trends_series (category_id, keyword, timeframe, geo, fetched_at, "
+                    "interest_over_time, interest_by_region, full_fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                excess = self._db.execute("SELECT COUNT(*) FROM trends_series").fetchone()[0] - self.max_rows
+                if excess > 0:
+                    self._db.execute(
+                        "DELETE FROM trends_series WHERE rowid IN "
+                        "(SELECT rowid FROM trends_series ORDER BY fetched_at LIMIT ?)",
+                        (excess,)
+                    )
+                self._db.commit()
+                self._writes += 1
+            except sqlite3.Error as e:
+                self._errors += 1
+                print(f"Error writing trends store database: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "enabled": self._db is not None,
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "errors": self._errors
+            }
+            if self._db is not None:
+                try:
+                    stats["series"] = self._db.execute("SELECT COUNT(*) FROM trends_series").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return stats
@@ -0,0 +1,199 @@
+from typing import Dict, Any, Callable, Optional
+import os
+import random
+import threading
+import time
+
+from pytrends.exceptions import ResponseError, TooManyRequestsError
+
+# Google Trends request budget: sustained rate and burst size
+TRENDS_RATE_PER_SECOND = float(os.getenv('TRENDS_RATE_PER_SECOND', '1'))
+TRENDS_BURST = int(os.getenv('TRENDS_BURST', '5'))
+# How long a call may wait for a token before it is shed
+TRENDS_MAX_WAIT = float(os.getenv('TRENDS_MAX_WAIT', '10'))
+
+# Retries on 429 with exponential backoff and full jitter
+TRENDS_MAX_RETRIES = int(os.getenv('TRENDS_MAX_RETRIES', '3'))
+TRENDS_BACKOFF_BASE = float(os.getenv('TRENDS_BACKOFF_BASE', '1'))
+TRENDS_BACKOFF_MAX = float(os.getenv('TRENDS_BACKOFF_MAX', '30'))
+
+# Consecutive rate-limit failures that open the circuit, and how long it stays open
+TRENDS_BREAKER_THRESHOLD = int(os.getenv('TRENDS_BREAKER_THRESHOLD', '5'))
+TRENDS_BREAKER_COOLDOWN = float(os.getenv('TRENDS_BREAKER_COOLDOWN', '60'))
+
+class UpstreamUnavailable(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def is_rate_limited(error: Exception) -> bool:
+    if isinstance(error, TooManyRequestsError):
+        return True
+    response = getattr(error, 'response', None)
+    return isinstance(error, ResponseError) and getattr(response, 'status_code', None) == 429
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting up to timeout seconds; False if none became available."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else timeout
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures and lets a probe through after `cooldown`."""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._opens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                return False
+            # Half-open: let a single probe call through
+            self._probing = True
+            return True
+
+    def release(self):
+        """End a probe that neither succeeded nor hit the rate limit."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                if self._opened_at is None or self._probing:
+                    self._opens += 1
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opens": self._opens
+            }
+
+class UpstreamScheduler:
+    """Single gate for calls to a rate-limited upstream.
+
+    Every call takes a token from the bucket (waiting up to max_wait, else it
+    is shed), is retried on 429 with exponential backoff and full jitter, and
+    feeds a circuit breaker; while the circuit is open calls fail fast with
+    UpstreamUnavailable so callers can fall back to cached data.
+    """
+
+    def __init__(self, rate: float = TRENDS_RATE_PER_SECOND, burst: int = TRENDS_BURST,
+                 max_wait: float = TRENDS_MAX_WAIT, max_retries: int = TRENDS_MAX_RETRIES,
+                 backoff_base: float = TRENDS_BACKOFF_BASE, backoff_max: float = TRENDS_BACKOFF_MAX,
+                 breaker_threshold: int = TRENDS_BREAKER_THRESHOLD,
+                 breaker_cooldown: float = TRENDS_BREAKER_COOLDOWN):
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self.max_wait = max_wait
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "throttled": 0, "retried": 0, "shed": 0, "failed": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        self._count("calls")
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("shed")
+                raise UpstreamUnavailable("Google Trends is rate limiting us, please retry later",
+                                          self.breaker.retry_after())
+            if not self.bucket.acquire(self.max_wait):
+                self.breaker.release()
+                self._count("shed")
+                raise UpstreamUnavailable("Too many Google Trends requests queued, please retry later",
+                                          1 / self.bucket.rate if self.bucket.rate > 0 else self.max_wait)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limited(e):
+                    self.breaker.release()
+                    raise
+                self._count("throttled")
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    self._count("failed")
+                    raise UpstreamUnavailable("Google Trends rate limit exceeded, please retry later",
+                                              self.breaker.retry_after() or self.backoff_max) from e
+                self._count("retried")
+                time.sleep(self.backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "tokens_available": round(self.bucket.available, 2),
+            "circuit": self.breaker.stats()
+        }
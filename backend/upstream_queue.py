@@ -0,0 +1,180 @@
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, Callable
+import asyncio
+import os
+import threading
+import time
+
+from upstream import UpstreamUnavailable
+
+# Priority classes of upstream work, most urgent first: requests a user is
+# waiting on, cache warming, and batch exports
+UPSTREAM_PRIORITIES = ("interactive", "prefetch", "bulk")
+# Most jobs of each background class running at once (interactive jobs may use every slot)
+UPSTREAM_PREFETCH_CONCURRENCY = int(os.getenv('UPSTREAM_PREFETCH_CONCURRENCY', '1'))
+UPSTREAM_BULK_CONCURRENCY = int(os.getenv('UPSTREAM_BULK_CONCURRENCY', '2'))
+# Queued interactive jobs at which every queued background job is dropped
+UPSTREAM_PREEMPT_DEPTH = int(os.getenv('UPSTREAM_PREEMPT_DEPTH', '2'))
+# How long a job may wait in the queue before it is shed
+UPSTREAM_QUEUE_TIMEOUT = float(os.getenv('UPSTREAM_QUEUE_TIMEOUT', '30'))
+
+class UpstreamPreempted(UpstreamUnavailable):
+    pass
+
+class _Waiter:
+    def __init__(self, priority: str, wake: Callable[[], None]):
+        self.priority = priority
+        self.wake = wake
+        self.state = "waiting"
+        self.enqueued = time.perf_counter()
+
+class UpstreamQueue:
+    """Admits upstream jobs by priority class within a total and per-class concurrency limit.
+
+    Jobs wait in one FIFO per class; whenever a slot frees up the most urgent
+    class with room under its cap goes next, so background work only runs on
+    capacity interactive requests leave unused. Once `preempt_depth`
+    interactive jobs are queued, queued background jobs are dropped with
+    UpstreamPreempted (their callers serve cached data or retry later).
+    Works for threaded callers (`slot`) and asyncio callers (`async_slot`).
+    """
+
+    def __init__(self, name: str, concurrency: int, prefetch_concurrency: int = UPSTREAM_PREFETCH_CONCURRENCY,
+                 bulk_concurrency: int = UPSTREAM_BULK_CONCURRENCY, preempt_depth: int = UPSTREAM_PREEMPT_DEPTH,
+                 timeout: float = UPSTREAM_QUEUE_TIMEOUT):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.caps = {
+            "interactive": self.concurrency,
+            "prefetch": max(1, min(prefetch_concurrency, self.concurrency)),
+            "bulk": max(1, min(bulk_concurrency, self.concurrency))
+        }
+        self.preempt_depth = max(1, preempt_depth)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._waiting: Dict[str, deque] = {priority: deque() for priority in UPSTREAM_PRIORITIES}
+        self._running = {priority: 0 for priority in UPSTREAM_PRIORITIES}
+        self._counters = {
+            priority: {"admitted": 0, "preempted": 0, "timeouts": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for priority in UPSTREAM_PRIORITIES
+        }
+
+    def _check_priority(self, priority: str):
+        if priority not in self._waiting:
+            raise ValueError(f"Unknown upstream priority: {priority}")
+
+    def _dispatch(self):
+        # Called with the lock held
+        while sum(self._running.values()) < self.concurrency:
+            for priority in UPSTREAM_PRIORITIES:
+                if self._waiting[priority] and self._running[priority] < self.caps[priority]:
+                    break
+            else:
+                return
+            waiter = self._waiting[priority].popleft()
+            waiter.state = "admitted"
+            self._running[priority] += 1
+            counters = self._counters[priority]
+            counters["admitted"] += 1
+            waited = time.perf_counter() - waiter.enqueued
+            counters["wait_total"] += waited
+            counters["wait_max"] = max(counters["wait_max"], waited)
+            waiter.wake()
+
+    def _enqueue(self, priority: str, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(priority, wake)
+        with self._lock:
+            self._waiting[priority].append(waiter)
+            if priority == "interactive" and len(self._waiting["interactive"]) >= self.preempt_depth:
+                for background in UPSTREAM_PRIORITIES[1:]:
+                    while self._waiting[background]:
+                        dropped = self._waiting[background].popleft()
+                        dropped.state = "preempted"
+                        self._counters[background]["preempted"] += 1
+                        dropped.wake()
+            self._dispatch()
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Remove a waiter that stopped waiting; True if it had already been admitted."""
+        with self._lock:
+            if waiter.state == "waiting":
+                self._waiting[waiter.priority].remove(waiter)
+                waiter.state = "abandoned"
+                return False
+        return waiter.state == "admitted"
+
+    def _admitted(self, waiter: _Waiter):
+        if waiter.state == "preempted":
+            raise UpstreamPreempted(f"{self.name} {waiter.priority} job dropped for interactive requests",
+                                    self.timeout)
+        if waiter.state != "admitted":
+            with self._lock:
+                self._counters[waiter.priority]["timeouts"] += 1
+            raise UpstreamUnavailable(f"Too many {self.name} jobs queued, please retry later", self.timeout)
+
+    def _release(self, priority: str):
+        with self._lock:
+            self._running[priority] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: str):
+        """Hold one slot of the given class for the duration of the block, waiting for it in this thread."""
+        self._check_priority(priority)
+        admitted = threading.Event()
+        waiter = self._enqueue(priority, admitted.set)
+        if not admitted.wait(self.timeout):
+            # A job admitted right as the wait timed out keeps its slot
+            self._abandon(waiter)
+        self._admitted(waiter)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    @asynccontextmanager
+    async def async_slot(self, priority: str):
+        """Hold one slot of the given class for the duration of the block, awaiting it on the event loop."""
+        self._check_priority(priority)
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: admitted.done() or admitted.set_result(None))
+
+        waiter = self._enqueue(priority, wake)
+        try:
+            await asyncio.wait_for(asyncio.shield(admitted), self.timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self._release(priority)
+            raise
+        self._admitted(waiter)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"concurrency": self.concurrency}
+            for priority in UPSTREAM_PRIORITIES:
+                counters = self._counters[priority]
+                stats[priority] = {
+                    "max_concurrency": self.caps[priority],
+                    "queue_depth": len(self._waiting[priority]),
+                    "running": self._running[priority],
+                    "admitted": counters["admitted"],
+                    "preempted": counters["preempted"],
+                    "timeouts": counters["timeouts"],
+                    "wait_ms": {
+                        "mean": round(counters["wait_total"] / counters["admitted"] * 1000, 3)
+                        if counters["admitted"] else 0.0,
+                        "max": round(counters["wait_max"] * 1000, 3)
+                    }
+                }
+            return stats
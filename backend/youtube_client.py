@@ -0,0 +1,65 @@
+from typing import Dict, Any, Optional
+import os
+
+import httpx
+
+# YouTube Data API client configuration
+YOUTUBE_API_BASE_URL = os.getenv('YOUTUBE_API_BASE_URL', 'https://www.googleapis.com/youtube/v3')
+YOUTUBE_MAX_CONNECTIONS = int(os.getenv('YOUTUBE_MAX_CONNECTIONS', '20'))
+YOUTUBE_TIMEOUT = float(os.getenv('YOUTUBE_TIMEOUT', '10'))
+
+class YouTubeAPIError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"YouTube API error {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+class AsyncYouTubeClient:
+    """Awaitable YouTube Data API v3 client over a pooled keep-alive connection.
+
+    Mirrors the `youtube.search().list(...)` / `youtube.videos().list(...)`
+    calls as `await youtube.search(...)` / `await youtube.videos(...)`,
+    returning the decoded JSON response.
+    """
+
+    def __init__(self, api_key: str, base_url: str = YOUTUBE_API_BASE_URL,
+                 max_connections: int = YOUTUBE_MAX_CONNECTIONS, timeout: float = YOUTUBE_TIMEOUT):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created on first use so the pool belongs to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def _get(self, resource: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._get_client().get(f"/{resource}", params={**params, 'key': self.api_key})
+        if response.status_code != 200:
+            try:
+                message = response.json()['error']['message']
+            except Exception:
+                message = response.text
+            raise YouTubeAPIError(response.status_code, message)
+        return response.json()
+
+    async def search(self, **params) -> Dict[str, Any]:
+        return await self._get('search', params)
+
+    async def videos(self, **params) -> Dict[str, Any]:
+        return await self._get('videos', params)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
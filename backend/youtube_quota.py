@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+import os
+import threading
+
+from upstream import UpstreamUnavailable
+
+try:
+    from zoneinfo import ZoneInfo
+    # The YouTube Data API quota resets at midnight Pacific time
+    QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+except Exception:
+    print("Warning: Pacific time zone data not found, resetting the YouTube quota at 08:00 UTC")
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+# Daily quota of the API key and the units each call costs
+YOUTUBE_QUOTA_DAILY = int(os.getenv('YOUTUBE_QUOTA_DAILY', '10000'))
+YOUTUBE_QUOTA_COSTS = {"search": 100, "videos": 1}
+# Remaining units below which cache warming stops, user requests are answered
+# from stale snapshots where one exists, and no new searches are made at all
+YOUTUBE_QUOTA_PREFETCH_MIN = int(os.getenv('YOUTUBE_QUOTA_PREFETCH_MIN', '5000'))
+YOUTUBE_QUOTA_STALE_BELOW = int(os.getenv('YOUTUBE_QUOTA_STALE_BELOW', '2000'))
+YOUTUBE_QUOTA_RESERVE = int(os.getenv('YOUTUBE_QUOTA_RESERVE', '200'))
+# Keywords listed in the ledger's stats, by units spent
+YOUTUBE_QUOTA_TOP_KEYWORDS = 20
+
+class QuotaExhausted(UpstreamUnavailable):
+    pass
+
+class YouTubeQuotaLedger:
+    """Units of the YouTube Data API daily quota spent today, by endpoint, keyword and call.
+
+    Calls are charged before they are made, since failed calls cost quota too.
+    The ledger decides per priority class whether a fetch may still spend
+    units: background work stops first, then user requests fall back to
+    stale snapshots, and below the reserve nothing new is searched. A
+    quotaExceeded answer from the API marks the quota spent until the reset.
+    Counts are kept per process.
+    """
+
+    def __init__(self, daily: int = YOUTUBE_QUOTA_DAILY, prefetch_min: int = YOUTUBE_QUOTA_PREFETCH_MIN,
+                 stale_below: int = YOUTUBE_QUOTA_STALE_BELOW, reserve: int = YOUTUBE_QUOTA_RESERVE):
+        self.daily = daily
+        self.prefetch_min = prefetch_min
+        self.stale_below = stale_below
+        self.reserve = reserve
+        self._lock = threading.Lock()
+        self._day: Optional[str] = None
+        self._reset()
+
+    def _reset(self):
+        self._spent = 0
+        self._exhausted = False
+        self._by_endpoint: Dict[str, int] = {}
+        self._by_keyword: Dict[str, int] = {}
+        self._calls = {call: 0 for call in YOUTUBE_QUOTA_COSTS}
+        self._stale_served = 0
+        self._refused = 0
+
+    def _roll(self):
+        # Called with the lock held; starts a new ledger when the Pacific day changes
+        day = datetime.now(QUOTA_TIMEZONE).date().isoformat()
+        if day != self._day:
+            self._day = day
+            self._reset()
+
+    def _remaining(self) -> int:
+        return 0 if self._exhausted else max(0, self.daily - self._spent)
+
+    def seconds_until_reset(self) -> float:
+        now = datetime.now(QUOTA_TIMEZONE)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=QUOTA_TIMEZONE)
+        return max(1.0, (midnight - now).total_seconds())
+
+    def mode(self, priority: str = "interactive") -> str:
+        """How a fetch of the given class is handled now: "fetch", "stale" (prefer a stale snapshot) or "refuse"."""
+        with self._lock:
+            self._roll()
+            remaining = self._remaining()
+        if remaining < self.reserve or (priority != "interactive" and remaining < self.prefetch_min):
+            return "refuse"
+        return "stale" if remaining < self.stale_below else "fetch"
+
+    def refuse(self, stale_served: bool):
+        """Record a fetch that was skipped for lack of quota; raises unless a stale snapshot was served."""
+        with self._lock:
+            if stale_served:
+                self._stale_served += 1
+                return
+            self._refused += 1
+        raise QuotaExhausted("YouTube API quota is nearly used up for today, please retry later",
+                             self.seconds_until_reset())
+
+    def charge(self, call: str, endpoint: str, keyword: str):
+        units = YOUTUBE_QUOTA_COSTS[call]
+        key = keyword.strip().lower()
+        with self._lock:
+            self._roll()
+            self._spent += units
+            self._calls[call] += 1
+            self._by_endpoint[endpoint] = self._by_endpoint.get(endpoint, 0) + units
+            self._by_keyword[key] = self._by_keyword.get(key, 0) + units
+
+    def exhaust(self):
+        """The API reported the quota exceeded; spend nothing more until the reset."""
+        with self._lock:
+            self._roll()
+            self._exhausted = True
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate numbers only, for unauthenticated metrics (no keywords or endpoints)."""
+        with self._lock:
+            self._roll()
+            spent, remaining = self._spent, self._remaining()
+        return {"spent": spent, "remaining": remaining, "mode": self.mode()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._roll()
+            top_keywords = sorted(self._by_keyword.items(), key=lambda item: item[1], reverse=True)
+            stats = {
+                "day": self._day,
+                "daily_quota": self.daily,
+                "spent": self._spent,
+                "remaining": self._remaining(),
+                "exhausted_by_api": self._exhausted,
+                "by_endpoint": dict(self._by_endpoint),
+                "by_call": dict(self._calls),
+                "top_keywords": dict(top_keywords[:YOUTUBE_QUOTA_TOP_KEYWORDS]),
+                "stale_served": self._stale_served,
+                "refused": self._refused,
+                "thresholds": {
+                    "prefetch_min": self.prefetch_min,
+                    "stale_below": self.stale_below,
+                    "reserve": self.reserve
+                }
+            }
+        stats["mode"] = self.mode()
+        stats["resets_in_seconds"] = int(self.seconds_until_reset())
+        return stats
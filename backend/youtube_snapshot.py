@@ -0,0 +1,265 @@
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import asyncio
+import os
+import time
+
+from langdetect import detect
+
+from singleflight import AsyncSingleFlight
+from upstream_queue import UpstreamPreempted, UpstreamQueue
+from youtube_client import YouTubeAPIError
+from youtube_quota import YouTubeQuotaLedger
+
+# Search snapshot configuration
+YOUTUBE_SNAPSHOT_TTL = float(os.getenv('YOUTUBE_SNAPSHOT_TTL', '600'))
+YOUTUBE_SNAPSHOT_MAX_KEYWORDS = int(os.getenv('YOUTUBE_SNAPSHOT_MAX_KEYWORDS', '500'))
+YOUTUBE_SNAPSHOT_MAX_RESULTS = 50
+# Search pages are collected until this many English titles contain the keyword
+# (what the sentiment and tags analyses use), within a page and a time limit;
+# every page costs another 100 quota units
+YOUTUBE_COLLECT_TARGET = int(os.getenv('YOUTUBE_COLLECT_TARGET', '25'))
+YOUTUBE_COLLECT_MAX_PAGES = int(os.getenv('YOUTUBE_COLLECT_MAX_PAGES', '3'))
+YOUTUBE_COLLECT_DEADLINE = float(os.getenv('YOUTUBE_COLLECT_DEADLINE', '8'))
+# Partial-response masks: only the fields the analyses read are sent, instead of
+# full snippets with long descriptions, every thumbnail size and localizations
+YOUTUBE_SEARCH_FIELDS = 'nextPageToken,items(id/videoId,snippet(title,description))'
+YOUTUBE_VIDEO_FIELDS = 'items(id,snippet(title,channelTitle,tags,thumbnails/default/url),statistics/viewCount)'
+
+def is_english(title: str) -> bool:
+    try:
+        return detect(title) == 'en'
+    except Exception:
+        return False
+
+class SearchResult:
+    """The parts of a search result the analyses use."""
+    __slots__ = ('video_id', 'title', 'description')
+
+    def __init__(self, item: Dict[str, Any]):
+        snippet = item['snippet']
+        self.video_id = item['id']['videoId']
+        self.title = snippet['title']
+        self.description = snippet.get('description', '')
+
+class VideoDetails:
+    """The parts of a videos().list item the analyses use."""
+    __slots__ = ('video_id', 'title', 'channel', 'thumbnail', 'tags', 'views')
+
+    def __init__(self, item: Dict[str, Any]):
+        snippet = item['snippet']
+        self.video_id = item['id']
+        self.title = snippet['title']
+        self.channel = snippet['channelTitle']
+        self.thumbnail = snippet['thumbnails']['default']['url']
+        self.tags = snippet.get('tags', [])
+        self.views = int(item.get('statistics', {}).get('viewCount', 0))
+
+class YouTubeSnapshot:
+    """One search for a keyword (one or more result pages) plus the details of every video it returned."""
+
+    def __init__(self, keyword: str, results: List[SearchResult],
+                 videos: List[VideoDetails], english: Optional[Dict[str, bool]] = None):
+        self.keyword = keyword
+        self.fetched_at = time.time()
+        self.results = results
+        self.videos = {video.video_id: video for video in videos}
+        self._english: Dict[str, bool] = english if english is not None else {}
+
+    def is_english(self, title: str) -> bool:
+        # Detected on demand and remembered, since every analysis filters on it
+        if title not in self._english:
+            self._english[title] = is_english(title)
+        return self._english[title]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+class YouTubeSnapshotStore:
+    """Per-keyword search snapshots shared by the top-videos, sentiment and tags analyses.
+
+    Each snapshot costs one search (100 quota units) and one videos call (1 unit)
+    per result page, collected until enough titles qualify for the analyses,
+    and is reused by every analysis of the keyword until it is older than the TTL.
+    With a quota ledger, fetches are charged to the requesting endpoint and
+    keyword, and when the ledger says so user requests get the keyword's
+    stale snapshot instead (or QuotaExhausted when there is none).
+    """
+
+    def __init__(self, youtube, ttl: float = YOUTUBE_SNAPSHOT_TTL,
+                 max_keywords: int = YOUTUBE_SNAPSHOT_MAX_KEYWORDS, queue: Optional[UpstreamQueue] = None,
+                 quota: Optional[YouTubeQuotaLedger] = None, collect_target: int = YOUTUBE_COLLECT_TARGET,
+                 collect_max_pages: int = YOUTUBE_COLLECT_MAX_PAGES, collect_deadline: float = YOUTUBE_COLLECT_DEADLINE):
+        self.youtube = youtube
+        self.queue = queue
+        self.quota = quota
+        self.ttl = ttl
+        self.max_keywords = max(1, max_keywords)
+        self._snapshots: OrderedDict = OrderedDict()
+        self.flight = AsyncSingleFlight()
+        self.collect_target = collect_target
+        self.collect_max_pages = max(1, collect_max_pages)
+        self.collect_deadline = collect_deadline
+        self._hits = 0
+        self._fetches = 0
+        self._pages = 0
+        self._deadline_stops = 0
+
+    async def get(self, keyword: str, priority: str = "interactive", endpoint: str = "other",
+                  refresh: bool = False) -> YouTubeSnapshot:
+        """The keyword's snapshot, fetched unless a fresh one is cached (or always, with refresh)."""
+        key = keyword.strip().lower()
+        seen = self._snapshots.get(key)
+        snapshot = self._fresh(key)
+        if snapshot is not None and not refresh:
+            self._hits += 1
+            return snapshot
+
+        if self.quota is not None:
+            mode = self.quota.mode(priority)
+            stale = self._snapshots.get(key) if priority == "interactive" else None
+            if mode == "refuse" or (mode == "stale" and stale is not None):
+                self.quota.refuse(stale_served=stale is not None)
+                return stale
+
+        # Concurrent requests for the same keyword share one upstream fetch, and
+        # only that fetch waits for a queue slot
+        async def lead():
+            if self.queue is None:
+                return await self._refresh(key, keyword, endpoint)
+            async with self.queue.async_slot(priority):
+                # Another fetch may have refreshed the keyword while this one queued
+                snapshot = self._fresh(key)
+                if snapshot is not None and snapshot is not seen:
+                    return snapshot
+                return await self._refresh(key, keyword, endpoint)
+
+        try:
+            return await self.flight.do(key, lead)
+        except UpstreamPreempted:
+            # Joined a background fetch that was dropped for interactive requests
+            if priority != "interactive":
+                raise
+            return await self.flight.do(key, lead)
+
+    async def _refresh(self, key: str, keyword: str, endpoint: str) -> YouTubeSnapshot:
+        snapshot = await self._fetch(keyword, endpoint)
+        self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_keywords:
+            self._snapshots.popitem(last=False)
+        return snapshot
+
+    def expires_in(self, keyword: str) -> float:
+        """Seconds until the keyword's snapshot goes stale, 0 when there is none."""
+        snapshot = self._snapshots.get(keyword.strip().lower())
+        return max(0.0, self.ttl - snapshot.age) if snapshot is not None else 0.0
+
+    def _fresh(self, key: str):
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.age < self.ttl:
+            return snapshot
+        return None
+
+    def _charge(self, call: str, endpoint: str, keyword: str):
+        if self.quota is not None:
+            self.quota.charge(call, endpoint, keyword)
+
+    async def _fetch(self, keyword: str, endpoint: str) -> YouTubeSnapshot:
+        try:
+            return await self._fetch_snapshot(keyword, endpoint)
+        except YouTubeAPIError as e:
+            if self.quota is not None and e.status_code == 403 and 'quota' in e.message.lower():
+                self.quota.exhaust()
+            raise
+
+    def _qualifying(self, results: List[SearchResult], keyword: str, english: Dict[str, bool], needed: int) -> List[str]:
+        """Titles of the results that are English and contain the keyword, detecting languages into `english`.
+
+        Detection stops once `needed` titles qualify, or once the remaining
+        candidates could no longer reach it, since either settles whether
+        another page is needed; the analyses detect the rest on demand.
+        """
+        candidates = [result.title for result in results if keyword.lower() in result.title.lower()]
+        titles = []
+        for checked, title in enumerate(candidates):
+            if len(titles) >= needed or len(titles) + len(candidates) - checked < needed:
+                break
+            if title not in english:
+                english[title] = is_english(title)
+            if english[title]:
+                titles.append(title)
+        return titles
+
+    async def _fetch_snapshot(self, keyword: str, endpoint: str) -> YouTubeSnapshot:
+        """Collect search pages until enough titles qualify, fetching each page's video details alongside.
+
+        The next page is only requested while the quota ledger allows full
+        fetches, and collection stops at the page limit or the deadline
+        (past the first page, a search that would overrun it is abandoned and
+        the pages collected so far are used).
+        """
+        self._fetches += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.collect_deadline
+        results, details, seen = [], [], set()
+        english: Dict[str, bool] = {}
+        qualifying = set()
+        page_token = None
+        try:
+            for page in range(self.collect_max_pages):
+                if page > 0 and (loop.time() >= deadline or (self.quota is not None and self.quota.mode() != "fetch")):
+                    break
+                params = dict(q=f'"{keyword}"', part='snippet', type='video', order='viewCount',
+                              maxResults=YOUTUBE_SNAPSHOT_MAX_RESULTS, safeSearch='strict',
+                              fields=YOUTUBE_SEARCH_FIELDS)
+                if page_token:
+                    params['pageToken'] = page_token
+                self._charge("search", endpoint, keyword)
+                search = self.youtube.search(**params)
+                search_response = await (search if page == 0 else asyncio.wait_for(search, deadline - loop.time()))
+                self._pages += 1
+
+                # Pages can repeat videos; keep the first occurrence
+                page_results = [SearchResult(item) for item in search_response.get('items', [])]
+                page_results = [result for result in page_results if result.video_id not in seen]
+                seen.update(result.video_id for result in page_results)
+                results.extend(page_results)
+                if page_results:
+                    self._charge("videos", endpoint, keyword)
+                    details.append(asyncio.ensure_future(self.youtube.videos(
+                        part='snippet,statistics',
+                        id=','.join(result.video_id for result in page_results),
+                        fields=YOUTUBE_VIDEO_FIELDS
+                    )))
+
+                # Language detection is CPU-bound, so keep it off the event loop
+                qualifying.update(await loop.run_in_executor(
+                    None, self._qualifying, page_results, keyword, english, self.collect_target - len(qualifying)
+                ))
+                page_token = search_response.get('nextPageToken')
+                if len(qualifying) >= self.collect_target or not page_token:
+                    break
+        except asyncio.TimeoutError:
+            self._deadline_stops += 1
+        except Exception:
+            for task in details:
+                task.cancel()
+            raise
+
+        videos = []
+        for video_response in await asyncio.gather(*details):
+            videos.extend(VideoDetails(item) for item in video_response.get('items', []))
+        return YouTubeSnapshot(keyword, results, videos, english)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keywords": len(self._snapshots),
+            "ttl_seconds": self.ttl,
+            "hits": self._hits,
+            "fetches": self._fetches,
+            "search_pages": self._pages,
+            "deadline_stops": self._deadline_stops,
+            "single_flight": self.flight.stats()
+        }
@@ -32,49 +32,27 @@ const YouTubeSection = ({ keyword, shouldFetch }) => {
       // Get authentication headers
       const headers = await config.getHeaders();
 
-      // Fetch top videos
-      setLoading(prev => ({ ...prev, videos: true }));
+      // Fetch videos, sentiment and tags in one request
+      setLoading({ videos: true, sentiment: true, tags: true });
       try {
         const response = await fetch(
-          `${config.apiBaseUrl}/youtube/top-videos/${encodeURIComponent(keyword)}`,
+          `${config.apiBaseUrl}/youtube/summary/${encodeURIComponent(keyword)}`,
           { headers }
         );
-        if (!response.ok) throw new Error('Failed to fetch top videos');
+        if (!response.ok) throw new Error('Failed to fetch YouTube data');
         const data = await response.json();
         setTopVideos(data.videos);
-      } catch (err) {
-        setError(prev => ({ ...prev, videos: err.message }));
-      } finally {
-        setLoading(prev => ({ ...prev, videos: false }));
-      }
-
-      // Fetch sentiment analysis
-      setLoading(prev => ({ ...prev, sentiment: true }));
-      try {
-        const response = await fetch(
-          `${config.apiBaseUrl}/youtube/sentiment/${encodeURIComponent(keyword)}`,
-          { headers }
-        );
-        if (!response.ok) throw new Error('Failed to fetch sentiment data');
-        const data = await response.json();
-        setSentimentData(data);
-      } catch (err) {
-        setError(prev => ({ ...prev, sentiment: err.message }));
-      } finally {
-        setLoading(prev => ({ ...prev, sentiment: false }));
-      }
-
-      // Fetch trending tags
-      setLoading(prev => ({ ...prev, tags: true }));
-      try {
-        const response = await fetch(`${config.apiBaseUrl}/youtube/trending-tags/${encodeURIComponent(keyword)}`);
-        if (!response.ok) throw new Error('Failed to fetch trending tags');
-        const data = await response.json();
+        setSentimentData(data.sentiment);
         setTrendingTags(data.tags);
+        setError({
+          videos: data.errors.videos ? 'Failed to fetch top videos' : null,
+          sentiment: data.errors.sentiment ? 'Failed to fetch sentiment data' : null,
+          tags: data.errors.tags ? 'Failed to fetch trending tags' : null
+        });
       } catch (err) {
-        setError(prev => ({ ...prev, tags: err.message }));
+        setError({ videos: err.message, sentiment: err.message, tags: err.message });
       } finally {
-        setLoading(prev => ({ ...prev, tags: false }));
+        setLoading({ videos: false, sentiment: false, tags: false });
       }
 
       setLastFetchedKeyword(keyword);
@@ -142,7 +120,7 @@ const YouTubeSection = ({ keyword, shouldFetch }) => {
         ) : sentimentData ? (
           <div>
             <div className="mb-4 text-sm text-gray-600">
-              Based on {sentimentData.total_analyzed} recent video titles
+              Based on {sentimentData.total_analyzed} most-viewed video titles
             </div>
             <div className="space-y-4">
               {Object.entries(sentimentData.sentiment_percentages).map(([sentiment, percentage]) => (